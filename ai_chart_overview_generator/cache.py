@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import threading
+
+# Parsed LLM output keyed by a hash of the canonical inputs
+_MEMORY_CACHE = {}
+
+# Same results persisted across runs (the per-run output folders are timestamped)
+AI_CACHE_DIR = os.path.join("output", ".ai_cache")
+
+# REI_AI_CACHE=0 ignores summaries saved by earlier runs; fresh ones are still saved
+AI_CACHE_ENABLED = os.getenv("REI_AI_CACHE", "1") != "0"
+
+
+def summary_key(labels, segment_filters, columns):
+    """Stable hash of the (labels with counts, filters, columns) tuple."""
+    payload = json.dumps(
+        {"l": sorted(labels.items()), "f": segment_filters, "c": list(columns)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode()).hexdigest()
+
+
+def get_cached_summary(key):
+    """Return the stored summary for `key` from memory or disk, else None."""
+    if key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+    if not AI_CACHE_ENABLED:
+        return None
+    try:
+        with open(os.path.join(AI_CACHE_DIR, f"{key}.json"), encoding="utf-8") as f:
+            segments = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _MEMORY_CACHE[key] = segments
+    return segments
+
+
+def store_summary(key, segments):
+    """Remember `segments` in memory and on disk; disk errors are not fatal."""
+    _MEMORY_CACHE[key] = segments
+    path = os.path.join(AI_CACHE_DIR, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(AI_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(segments, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return segments
@@ -3,14 +3,135 @@ from dotenv import load_dotenv
 from groq import Groq
 import json
 import re
+import threading
+import time
+from functools import lru_cache
+
+from ai_chart_overview_generator.cache import get_cached_summary, store_summary, summary_key
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is used otherwise
+    orjson = None
 
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
-def generate_pie_label_summary(labels, segment_filters, columns) -> str:
-    prompt = generate_prompt(labels=labels, segment_filters=segment_filters, columns=columns)
-    response = client.chat.completions.create(
+@lru_cache(maxsize=1)
+def get_groq_client():
+    """Create the shared Groq client on first use."""
+    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+
+# Requests per minute allowed by the Groq plan in use
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+
+
+class _TokenBucket:
+    """
+    Pro-active request limiter for Groq calls from parallel usecase threads.
+
+    Each call reserves a token up front; when the bucket is empty the caller
+    waits until its reservation refills instead of hitting a 429.
+    """
+
+    def __init__(self, requests_per_minute, burst=3):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it has refilled if the bucket is empty."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        if delay:
+            time.sleep(delay)
+
+
+_bucket = _TokenBucket(GROQ_REQUESTS_PER_MINUTE)
+
+# Static instructions and output schema, built once at import.
+# Only the per-chart data block is rendered on each call.
+STATIC_PROMPT_HEADER = """
+For each pie chart segment, generate:
+
+1. A heading in the format:
+{{Segment Title}} ({{Count}})
+
+2. A 2–3 sentence explanation describing:
+- What the segment represents
+- Why these records fall into this category (based on columns involved)
+- The operational or business implication, if evident
+
+Guidelines:
+- Write a separate block for each segment
+- Use clear, professional business language
+- Base explanations strictly on the data and filters provided
+- Do not compare segments with each other
+- Do not mention chart mechanics or visualization terms
+- Keep each explanation concise (40–60 words max)
+- You are a function that returns ONLY valid JSON
+- Do not include explanations, markdown, or text outside JSON
+
+If a filter is not provided for a segment, treat it as all records excluding those covered by other segment filters.
+
+Output:
+Return ONLY valid JSON.
+Do not include markdown, explanations, or extra text.
+
+The response MUST be a JSON array.
+Each array item MUST follow this schema:
+[
+  {
+    "segment_no": number,
+    "title": string,
+    "description": string
+  }
+]
+""".strip()
+
+
+def generate_pie_label_summary(labels, segment_filters, columns) -> list:
+    key = summary_key(labels, segment_filters, columns)
+    cached = get_cached_summary(key)
+    if cached is not None:
+        return cached
+    return store_summary(key, _request_summary(
+        generate_prompt(labels=labels, segment_filters=segment_filters, columns=columns)
+    ))
+
+
+# Outermost JSON array in a reply that may carry fences or trailing prose
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.S)
+
+
+def _parse_groq_json(raw):
+    """
+    Salvage the JSON array from a model reply before giving up on it.
+
+    Strips markdown fences and surrounding text; still raises ValueError
+    when nothing parseable is left.
+    """
+    raw = raw.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+    match = _JSON_ARRAY_RE.search(raw)
+    text = match.group(0) if match else raw
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _request_summary(prompt):
+    _bucket.acquire()
+    response = get_groq_client().chat.completions.create(
         model="compound-beta",
         messages=[
             {
@@ -28,7 +149,8 @@ def generate_pie_label_summary(labels, segment_filters, columns) -> str:
         max_tokens=600
     )
     raw_output = response.choices[0].message.content or ""
-    return json.loads(raw_output)
+    return _parse_groq_json(raw_output)
+
 
 def generate_prompt(labels, segment_filters, columns):
     segments_text = "\n".join(
@@ -49,26 +171,7 @@ def generate_prompt(labels, segment_filters, columns):
     filters_text = "\n".join(filters_text)
     columns_text = "\n".join([f"- {col}" for col in columns])
 
-    prompt = f"""
-For each pie chart segment, generate:
-
-1. A heading in the format:
-{{{{Segment Title}}}} ({{{{Count}}}})
-
-2. A 2–3 sentence explanation describing:
-- What the segment represents
-- Why these records fall into this category (based on columns involved)
-- The operational or business implication, if evident
-
-Guidelines:
-- Write a separate block for each segment
-- Use clear, professional business language
-- Base explanations strictly on the data and filters provided
-- Do not compare segments with each other
-- Do not mention chart mechanics or visualization terms
-- Keep each explanation concise (40–60 words max)
-- You are a function that returns ONLY valid JSON
-- Do not include explanations, markdown, or text outside JSON
+    return f"""{STATIC_PROMPT_HEADER}
 
 Input:
 Segments:
@@ -77,27 +180,8 @@ Segments:
 Filters applied per segment:
 {filters_text}
 
-If a filter is not provided for a segment, treat it as all records excluding those covered by other segment filters.
-
 Columns involved:
-{columns_text}
-
-Output:
-Return ONLY valid JSON.
-Do not include markdown, explanations, or extra text.
-
-The response MUST be a JSON array.
-Each array item MUST follow this schema:
-[
-  {{
-    "segment_no": number,
-    "title": string,
-    "description": string
-  }}
-]
-""".strip()
-
-    return prompt
+{columns_text}"""
 
 def build_pie_segments(
     llm_output,
@@ -1,27 +1,83 @@
+import matplotlib
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+import threading
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.patches import ConnectionPatch
 from matplotlib.ticker import FuncFormatter
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence
+import io
 import os
 
 
-def bar_chart(df, column, output_path):
-    counts = df[column].value_counts()
+DEFAULT_DPI = 150
 
-    plt.figure()
-    counts.plot(kind="bar")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
+# Charts embedded in the PDFs are drawn this tall (points); rendering them at
+# a matching pixel size means ReportLab embeds them without rescaling
+REPORT_CHART_HEIGHT_PT = 300
+REPORT_PIXELS_PER_POINT = 2  # headroom so text stays sharp when zoomed/printed
+
+# One-time process-wide defaults. Charts pass sizes explicitly instead of
+# changing rcParams, which are global and shared by every usecase thread
+plt.rcParams.update({"figure.autolayout": False, "savefig.bbox": "standard"})
+
+
+def _report_dpi(fig):
+    """DPI that renders `fig` exactly REPORT_CHART_HEIGHT_PT * REPORT_PIXELS_PER_POINT px tall."""
+    return REPORT_CHART_HEIGHT_PT * REPORT_PIXELS_PER_POINT / fig.get_figheight()
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path):
+    """Create an output directory once per process."""
+    if path:
+        os.makedirs(path, exist_ok=True)
+
+# ------------------------------------------------------------------
+# Single-axes charts share one Figure; the lock serialises access
+# ------------------------------------------------------------------
+_REUSABLE_FIG = Figure(figsize=(10, 6))
+FigureCanvasAgg(_REUSABLE_FIG)
+_REUSABLE_AX = _REUSABLE_FIG.subplots()
+_REUSABLE_LOCK = threading.Lock()
+
+_DEFAULT_SUBPLOT_PARAMS = {
+    key: plt.rcParams[f"figure.subplot.{key}"]
+    for key in ("left", "right", "bottom", "top", "wspace", "hspace")
+}
+
+
+def _reset_reusable_figure(figsize):
+    """Clear the shared axes and restore size and layout. Call with _REUSABLE_LOCK held."""
+    _REUSABLE_AX.cla()
+    _REUSABLE_AX.set_aspect("auto", adjustable="box")
+    _REUSABLE_AX.set_frame_on(True)
+    _REUSABLE_AX.set_axis_on()
+    _REUSABLE_FIG.set_size_inches(figsize)
+    _REUSABLE_FIG.subplots_adjust(**_DEFAULT_SUBPLOT_PARAMS)
+    return _REUSABLE_FIG, _REUSABLE_AX
 
-    return output_path
 
-def bar_chart_executive(usecase_names, losses, output_path):
+def bar_chart(df, column, output_path, dpi=DEFAULT_DPI, sort_bars=False):
+    counts = df[column].value_counts(dropna=False, sort=False)
+    if sort_bars:
+        counts = counts.sort_values(ascending=False)
 
-    import matplotlib.pyplot as plt
-    import numpy as np
+    with _REUSABLE_LOCK:
+        fig, ax = _reset_reusable_figure(plt.rcParams["figure.figsize"])
+        counts.plot(kind="bar", ax=ax)
+        fig.tight_layout()
+        fig.savefig(output_path, dpi=dpi)
+        ax.cla()
+
+    return output_path
+
+def bar_chart_executive(usecase_names, losses, output_path, dpi=None):
 
     if not usecase_names or not losses:
         raise ValueError("usecase_names and losses cannot be empty")
@@ -29,39 +85,39 @@ def bar_chart_executive(usecase_names, losses, output_path):
     if len(usecase_names) != len(losses):
         raise ValueError("usecase_names and losses must be same length")
 
-    plt.figure(figsize=(10, 6))
-
     # 🔵 Different shades of blue
-    colors = plt.cm.get_cmap('Blues')(np.linspace(0.4, 0.9, len(usecase_names)))
+    colors = matplotlib.colormaps['Blues'](np.linspace(0.4, 0.9, len(usecase_names)))
 
-    bars = plt.barh(usecase_names, losses, color=colors)
+    with _REUSABLE_LOCK:
+        fig, ax = _reset_reusable_figure((10, 6))
 
-    plt.xlabel("Revenue Loss ($)", fontsize=10)
-    plt.ylabel("Use Cases", fontsize=10)
+        bars = ax.barh(usecase_names, losses, color=colors)
 
-    plt.gca().tick_params(axis='y', labelsize=8)
-    plt.gca().tick_params(axis='x', labelsize=8)
+        ax.set_xlabel("Revenue Loss ($)", fontsize=10)
+        ax.set_ylabel("Use Cases", fontsize=10)
 
-    plt.gca().xaxis.set_major_formatter(
-        FuncFormatter(lambda x, p: format(int(x), ","))
-    )
+        ax.tick_params(axis='y', labelsize=8)
+        ax.tick_params(axis='x', labelsize=8)
 
-    plt.gca().invert_yaxis()  # Highest at top
+        ax.xaxis.set_major_formatter(
+            FuncFormatter(lambda x, p: format(int(x), ","))
+        )
+
+        ax.invert_yaxis()  # Highest at top
 
-    plt.grid(axis='x', linestyle='--', alpha=0.3)
+        ax.grid(axis='x', linestyle='--', alpha=0.3)
 
-    plt.tight_layout()
-    plt.savefig(output_path, bbox_inches="tight", dpi=300)
-    plt.show()
-    plt.close()
+        fig.tight_layout()
+        fig.savefig(output_path, dpi=dpi or _report_dpi(fig))
+        ax.cla()
 
     return output_path
 
 def zombie_analysis_chart(
-    df_all_contracts,
-    df_zombie_contracts,
-    df_expiring_soon=None,
-    output_path="leakage_chart.png"
+    counts,
+    zombie_start_dates,
+    output_path="leakage_chart.png",
+    dpi=None
 ):
     """
     Create a dual-panel chart with:
@@ -71,64 +127,54 @@ def zombie_analysis_chart(
     
     Parameters:
     -----------
-    df_all_contracts : DataFrame
-        Complete dataframe of all contracts
-    df_zombie_contracts : DataFrame
-        Dataframe of zombie (leakage) contracts
-    df_expiring_soon : DataFrame, optional
-        Dataframe of contracts expiring soon (Warning category)
+    counts : dict
+        Contract counts keyed by 'healthy', 'warning' and 'zombie'
+    zombie_start_dates : np.ndarray
+        StartDate values (datetime64) of the zombie contracts
     output_path : str
         Path to save the output image
+    dpi : int, optional
+        Output resolution; defaults to the report-sized resolution
     
     Returns:
     --------
     str : Path to the saved image
     """
     
-    # Convert StartDate to datetime
-    df_zombie_contracts_copy = df_zombie_contracts.copy()
-    df_zombie_contracts_copy['StartDate'] = pd.to_datetime(
-        df_zombie_contracts_copy['StartDate'],
-        errors='coerce'
-    )
-    
-    # Calculate zombie age buckets
+    # Calculate zombie age buckets from int64 bin edges
     today = pd.Timestamp.today()
-    zombie_buckets = pd.cut(
-        df_zombie_contracts_copy['StartDate'],
-        bins=[
-            pd.Timestamp.min,
-            today - pd.DateOffset(years=2),
-            today - pd.DateOffset(years=1),
-            today
-        ],
-        labels=[
-            'Older than 2 Years',
-            '1–2 Years Old',
-            'Less than 1 Year'
-        ]
-    )
-    
-    zombie_counts = zombie_buckets.value_counts().sort_index()
-    
-    # Calculate overall contract counts
-    healthy_count = len(df_all_contracts) - len(df_zombie_contracts) - (len(df_expiring_soon) if df_expiring_soon is not None else 0)
-    warning_count = len(df_expiring_soon) if df_expiring_soon is not None else 0
-    zombie_count = len(df_zombie_contracts)
-    
+    edges = np.array([
+        pd.Timestamp.min.value,
+        (today - pd.DateOffset(years=2)).value,
+        (today - pd.DateOffset(years=1)).value,
+        today.value,
+    ], dtype="int64")
+
+    start_dates = np.asarray(zombie_start_dates, dtype="datetime64[ns]")
+    dates_i8 = start_dates[~np.isnat(start_dates)].view("int64")
+
+    # Start dates after today fall outside every bucket, as with pd.cut
+    dates_i8 = dates_i8[dates_i8 <= edges[-1]]
+    idx = np.clip(np.searchsorted(edges, dates_i8, side="left") - 1, 0, 2)
+    zombie_counts = np.bincount(idx, minlength=3)
     
+    # Overall contract counts
+    healthy_count = counts.get("healthy", 0)
+    warning_count = counts.get("warning", 0)
+    zombie_count = counts.get("zombie", 0)
     
     labels = ['Healthy Contracts', 'Warning Contracts', 'Zombie Contracts']
-    sizes = [
+    sizes = np.array([
         healthy_count,
         warning_count,
         zombie_count
-    ]
+    ], dtype=float)
     
     colors = ['#88E788', '#FFEE8C', '#FA5053']
     explode = [0, 0, 0.1]
     
-    overall_ratios = np.array(sizes) / sum(sizes)
+    sizes_sum = sizes.sum()
+    overall_ratios = sizes / sizes_sum
     
     zombie_idx = 2
     startangle = (
@@ -136,7 +182,10 @@ def zombie_analysis_chart(
         + 180 * overall_ratios[zombie_idx]
     )
     
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 5))
+    # Standalone Figure (no pyplot state) so use cases can render concurrently
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(1, 2)
     fig.subplots_adjust(wspace=0)
     
     wedges, *_ = ax1.pie(
@@ -152,10 +201,14 @@ def zombie_analysis_chart(
     #ax1.legend(loc="lower center",bbox_to_anchor=(0.52, -0.15),ncol=len(labels),frameon=False)
     ax1.axis('equal')
     
-    values = zombie_counts.to_numpy(dtype=float)
+    values = zombie_counts.astype(float)
 
     age_ratios = values / values.sum()
-    age_labels = zombie_counts.index.astype(str).tolist()
+    age_labels = [
+        'Older than 2 Years',
+        '1–2 Years Old',
+        'Less than 1 Year'
+    ]
 
     bottom = 1
     width = 0.25
@@ -179,16 +232,19 @@ def zombie_analysis_chart(
     ax2.set_xlim(-2.5 * width, 2.5 * width)
     
     zombie_wedge = wedges[zombie_idx]
-    theta1, theta2 = zombie_wedge.theta1, zombie_wedge.theta2
     center, r = zombie_wedge.center, zombie_wedge.r
     bar_height = sum(age_ratios)
     
-    x = r * np.cos(np.pi / 180 * theta2) + center[0]
-    y = r * np.sin(np.pi / 180 * theta2) + center[1]
+    # Wedge edge endpoints for both connectors in one vectorised pass
+    thetas = np.deg2rad(np.array([zombie_wedge.theta1, zombie_wedge.theta2]))
+    xs = r * np.cos(thetas) + center[0]
+    ys = r * np.sin(thetas) + center[1]
+    
+    # Top connector
     con = ConnectionPatch(
         xyA=(-width / 2, bar_height),
         coordsA=ax2.transData,
-        xyB=(x, y),
+        xyB=(xs[1], ys[1]),
         coordsB=ax1.transData,
         linewidth=2,
         color='#333333'
@@ -196,74 +252,80 @@ def zombie_analysis_chart(
     ax2.add_artist(con)
     
     # Bottom connector
-    x = r * np.cos(np.pi / 180 * theta1) + center[0]
-    y = r * np.sin(np.pi / 180 * theta1) + center[1]
     con = ConnectionPatch(
         xyA=(-width / 2, 0),
         coordsA=ax2.transData,
-        xyB=(x, y),
+        xyB=(xs[0], ys[0]),
         coordsB=ax1.transData,
         linewidth=2,
         color='#333333'
     )
     ax2.add_artist(con)
     
-    fig.show()
-    fig.savefig(output_path, dpi=300, bbox_inches="tight")
-    
-    plt.close()
+    fig.savefig(output_path, dpi=dpi or _report_dpi(fig))
     
     return output_path
 
-
-from typing import List
-import matplotlib.pyplot as plt
-import os
-
 def generate_pie_chart(
     labels: List[str],
     values: List[int],
     output_path: str,
     colors: List[str] | None = None,
+    dpi: int | None = None,
+    extra_output_paths: Sequence[str] = (),
 ):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    """
+    Render a pie chart with a bottom legend.
 
-    plt.rcParams.update({'font.size': 22})
+    The PNG is encoded once and the same bytes are written to output_path
+    and every path in extra_output_paths (e.g. the shared Data_Chart copy).
+    """
 
-    fig, ax = plt.subplots(figsize=(12, 14))  # ⬅️ taller for bottom legend
+    with _REUSABLE_LOCK:
+        fig, ax = _reset_reusable_figure((12, 14))  # ⬅️ taller for bottom legend
 
-    pie_result = plt.pie(
-    values,
-    labels=None,
-    autopct="%1.1f%%",
-    startangle=100,
-    colors=colors,
-    textprops={'fontsize': 30} 
-    )
-    wedges, autotexts = pie_result[:2]
+        pie_result = ax.pie(
+        values,
+        labels=None,
+        autopct="%1.1f%%",
+        startangle=100,
+        colors=colors,
+        textprops={'fontsize': 30} 
+        )
+        wedges, autotexts = pie_result[:2]
 
 
-    # Make percentage text readable
-    for autotext in autotexts:
-        autotext.set_color("black")
+        # Make percentage text readable
+        for autotext in autotexts:
+            autotext.set_color("black")
     
     
 
-    # Bottom legend
-    ax.legend(
-        wedges,
-        labels,
-        loc="upper center",
-        bbox_to_anchor=(0.5, -0.08),   
-        ncol=3,                        
-        frameon=False,
-        fontsize=30,
-    )
-    ax.axis("equal")
+        # Bottom legend
+        legend = ax.legend(
+            wedges,
+            labels,
+            loc="upper center",
+            bbox_to_anchor=(0.5, -0.08),   
+            ncol=3,                        
+            frameon=False,
+            fontsize=30,
+        )
+        ax.axis("equal")
 
-    plt.subplots_adjust(bottom=0.18)
+        # Leave room for the bottom legend, widening the canvas if long labels need it
+        fig.subplots_adjust(bottom=0.22)
+        legend_width = legend.get_window_extent(fig.canvas.get_renderer()).width / fig.dpi
+        if legend_width > fig.get_figwidth():
+            fig.set_size_inches(legend_width + 0.5, fig.get_figheight())
 
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    plt.close()
+        png = io.BytesIO()
+        fig.savefig(png, format="png", dpi=dpi or _report_dpi(fig))
+        ax.cla()
 
-    return output_path
\ No newline at end of file
+    for path in (output_path, *extra_output_paths):
+        _ensure_dir(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(png.getbuffer())
+
+    return output_path
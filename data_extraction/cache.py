@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    # ArrowNotImplementedError (e.g. an empty struct) is not a ValueError/TypeError
+    _PARQUET_WRITE_ERRORS = (OSError, ValueError, TypeError, ImportError, pa.ArrowException)
+except ImportError:
+    _PARQUET_WRITE_ERRORS = (OSError, ValueError, TypeError, ImportError)
+
+from data_extraction.loaders import records_iter_to_df
+from data_extraction.salesforce_client import client_username, run_bulk_query, run_query
+
+# Raw query results, one Parquet file per (org, user, SOQL, columns)
+SOQL_CACHE_DIR = ".soql_cache"
+
+# Development aid, off by default: production runs must report on live data.
+# REI_SOQL_CACHE_TTL=<seconds> reuses results fetched within that window.
+SOQL_CACHE_TTL = int(os.getenv("REI_SOQL_CACHE_TTL", "0"))
+
+# In-process copies keyed like the Parquet files: path -> (fetched_at, DataFrame)
+_MEMORY_CACHE = {}
+
+# One lock per query, so usecases running on parallel threads that issue the
+# same query wait for the first fetch instead of repeating it
+_QUERY_LOCKS = {}
+_QUERY_LOCKS_GUARD = threading.Lock()
+
+
+def _cache_path(sf, soql, columns, object_name):
+    """
+    Cache file for the query. The org instance keeps sandboxes and prod
+    apart; the username keeps users with different sharing rules apart.
+    """
+    payload = "\x1f".join([
+        getattr(sf, "sf_instance", "") or "",
+        client_username(sf),
+        object_name or "",
+        " ".join(soql.split()),
+        ",".join(columns or ()),
+    ])
+    key = hashlib.blake2b(payload.encode()).hexdigest()
+    return os.path.join(SOQL_CACHE_DIR, f"{key}.parquet")
+
+
+def cached_query(sf, soql, columns=None, ttl=None, object_name=None):
+    """
+    Run a SOQL query into a DataFrame, reusing a fresh in-process or Parquet copy.
+
+    Args:
+        sf: Salesforce client
+        soql: Query text (whitespace differences share one cache entry)
+        columns: Fields to keep, in order; keeps the schema stable when
+            the query returns no rows
+        ttl: Freshness window in seconds (defaults to REI_SOQL_CACHE_TTL)
+        object_name: Run through the Bulk API against this object instead
+            of the REST query endpoint
+
+    Returns:
+        DataFrame of the raw records (Salesforce field names); a shallow
+        copy, so in-place edits by one usecase never reach another
+    """
+    ttl = SOQL_CACHE_TTL if ttl is None else ttl
+    path = _cache_path(sf, soql, columns, object_name)
+
+    with _QUERY_LOCKS_GUARD:
+        lock = _QUERY_LOCKS.setdefault(path, threading.Lock())
+
+    with lock:
+        cached = _MEMORY_CACHE.get(path)
+        if cached is not None and time.time() - cached[0] < ttl:
+            return cached[1].copy(deep=False)
+
+        df = _load_or_fetch(sf, soql, columns, ttl, object_name, path)
+        if ttl > 0:
+            _MEMORY_CACHE[path] = (time.time(), df)
+        return df.copy(deep=False)
+
+
+def _load_or_fetch(sf, soql, columns, ttl, object_name, path):
+    """Read the Parquet copy if it is fresh, else query Salesforce and write it."""
+    if ttl > 0:
+        try:
+            if time.time() - os.path.getmtime(path) < ttl:
+                return pd.read_parquet(path, engine="pyarrow")
+        except (OSError, ValueError):
+            pass
+
+    if object_name:
+        records = run_bulk_query(sf, object_name, soql)
+    else:
+        records = run_query(sf, soql)
+    df = records_iter_to_df(records, columns) if columns else pd.DataFrame.from_records(records)
+
+    # Caching disabled: never persist raw org data to disk
+    if ttl <= 0:
+        return df
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(SOQL_CACHE_DIR, exist_ok=True)
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+    except _PARQUET_WRITE_ERRORS:
+        # An uncacheable frame (e.g. mixed-type column) is still returned
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return df
+
+
+def cached_total(sf, soql):
+    """
+    Value of a single-row aggregate query aliased as `total`
+    (e.g. "SELECT SUM(Amount) total FROM Opportunity").
+
+    Returns:
+        The total as float; 0.0 when Salesforce returns no rows or NULL
+    """
+    df = cached_query(sf, soql, columns=["total"])
+    total = df["total"].iloc[0] if len(df) else None
+    return 0.0 if total is None or pd.isna(total) else float(total)
@@ -1,17 +1,95 @@
+import json
+from functools import lru_cache
 import pandas as pd
-from typing import Dict, List, Optional,Mapping, Union, Any,TypeAlias
+from typing import Callable, Dict, List, Optional,Mapping, Union, Any,TypeAlias
 from typing import Mapping, Union, Any, TypeAlias
 from typing import TypeGuard
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except ImportError:  # optional; records_to_df falls back to pandas
+    pa = None
+
 NestedMapping = Dict[str, Any]
 
+# Enum-like Salesforce fields that are cheaper to filter as categoricals
+SALESFORCE_CATEGORICAL_COLUMNS = ["Status", "Type", "RecordTypeId", "SBQQ__SubscriptionType__c"]
+
+def _strip_attributes(records):
+    for record in records:
+        record.pop("attributes", None)
+        yield record
+
+
+def _same_flat_fields(records):
+    """Whether every record has the first one's keys and it holds no relationship dicts."""
+    first = records[0]
+    if any(isinstance(value, dict) for value in first.values()):
+        return False
+    keys = first.keys()
+    return all(record.keys() == keys for record in records)
+
+
 def records_to_df(records):
-    """Convert Salesforce query records to DataFrame."""
-    df = pd.DataFrame(records)
-    if "attributes" in df.columns:
-        df = df.drop(columns=["attributes"])
-    return df
+    """
+    Convert Salesforce query records (list or generator) to DataFrame.
+
+    The per-record "attributes" metadata is popped before construction so it
+    never becomes a column that has to be dropped afterwards.
+
+    Flat records are built column-wise through pyarrow when it is installed.
+    Arrow takes its columns from the first record, so that path is only used
+    when every record has the same fields. Records holding relationship dicts
+    stay on the pandas constructor, which keeps them as plain dict cells and
+    is faster than Arrow struct round-trips. Columns come back numpy-backed
+    (not pd.ArrowDtype): the usecases rely on NaN/None semantics and
+    .to_numpy() on them.
+    """
+    if isinstance(records, list):
+        for record in records:
+            record.pop("attributes", None)
+    else:
+        records = list(_strip_attributes(records))
+
+    if pa is not None and records and _same_flat_fields(records):
+        try:
+            return pa.Table.from_pylist(records).to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type field (e.g. str and number); let pandas use object
+            pass
+    return pd.DataFrame(records)
+
+
+def records_iter_to_df(records, columns):
+    """
+    Build a DataFrame with a fixed schema from a record stream in one pass.
+
+    Each record is projected onto `columns` as it arrives, so only small
+    tuples are held until construction (not the full record dicts with
+    their "attributes" metadata), and an empty stream still has the columns.
+    """
+    columns = list(columns)
+    rows = (tuple(record.get(column) for column in columns) for record in records)
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def normalize_relationship(column: pd.Series, fields: Dict[str, str]) -> pd.DataFrame:
+    """
+    Flatten one relationship column with a single pd.json_normalize(sep=".").
+
+    Args:
+        column: Series of nested records (None where the relationship is empty)
+        fields: Dotted paths inside the records mapped to output column names,
+                e.g. {'SBQQ__Opportunity__r.Name': 'Opportunity Name'}
+
+    Returns:
+        DataFrame with exactly the mapped columns, aligned to column.index
+    """
+    records = [value if isinstance(value, dict) else {} for value in column]
+    return pd.json_normalize(records, sep=".").reindex(
+        columns=list(fields)
+    ).rename(columns=fields).set_axis(column.index)
 
 
 def extract_nested_fields(df: pd.DataFrame, nested_mapping: Dict[str, Dict[str, str]]) -> pd.DataFrame:
@@ -26,18 +104,23 @@ def extract_nested_fields(df: pd.DataFrame, nested_mapping: Dict[str, Dict[str,
                                 'SBQQ__Opportunity__r': {'Name': 'Opportunity Name', 'Amount': 'Opportunity Amount'}}
     
     Returns:
-        DataFrame with extracted fields as new columns
+        New DataFrame (via assign) with extracted fields as new columns; the
+        input frame is not modified and unchanged columns are not copied
     """
-    df = df.copy()
+    new_columns = {}
     
     for nested_col, field_mapping in nested_mapping.items():
-        if nested_col in df.columns:
-            for field_name, new_col_name in field_mapping.items():
-                df[new_col_name] = df[nested_col].apply(
-                    lambda x: x.get(field_name) if isinstance(x, dict) else None
-                )
+        if nested_col not in df.columns:
+            continue
+
+        # Normalise the column once; missing relationships become empty records
+        values = [x if isinstance(x, dict) else {} for x in df[nested_col]]
+        normalized = pd.json_normalize(values, max_level=0).reindex(columns=list(field_mapping))
+
+        for field_name, new_col_name in field_mapping.items():
+            new_columns[new_col_name] = normalized[field_name].to_numpy()
     
-    return df
+    return df.assign(**new_columns)
 
 
 def is_nested_mapping(value: object) -> TypeGuard[NestedMapping]:
@@ -70,32 +153,94 @@ def extract_from_dict(
     return result
 
 
+def _flatten_mapping(
+    mapping: NestedMapping,
+    prefix: tuple[str, ...] = ()
+) -> list[tuple[str, tuple[str, ...]]]:
+    """Flatten a nested mapping into (output_column, key_path) pairs."""
+
+    paths: list[tuple[str, tuple[str, ...]]] = []
+
+    for key, value in mapping.items():
+        if isinstance(value, str):
+            paths.append((value, prefix + (key,)))
+        elif is_nested_mapping(value):
+            paths.extend(_flatten_mapping(value, prefix + (key,)))
+
+    return paths
+
+
+def compile_extractor(mapping: NestedMapping) -> Callable[[Any], dict[str, Any]]:
+    """
+    Compile a nested mapping into a straight-line extractor function.
+
+    The generated function does the same job as extract_from_dict, but it
+    unrolls the mapping into .get chains once instead of walking it per row.
+    Compiled functions are cached per mapping; key order is kept because it
+    decides the output column order.
+    """
+    return _compile_extractor(json.dumps(mapping))
+
+
+@lru_cache(maxsize=32)
+def _compile_extractor(mapping_json: str) -> Callable[[Any], dict[str, Any]]:
+    mapping = json.loads(mapping_json)
+    lines = [
+        "def _extract(r):",
+        "    if not isinstance(r, dict):",
+        "        r = _EMPTY",
+        "    out = {}",
+    ]
+    counter = 0
+
+    def emit(node: NestedMapping, source: str) -> None:
+        nonlocal counter
+        for key, value in node.items():
+            if isinstance(value, str):
+                lines.append(f"    out[{value!r}] = {source}.get({key!r})")
+            elif is_nested_mapping(value):
+                counter += 1
+                var = f"d{counter}"
+                lines.append(f"    {var} = {source}.get({key!r}) or _EMPTY")
+                emit(value, var)
+
+    emit(mapping, "r")
+    lines.append("    return out")
+
+    namespace: dict[str, Any] = {"_EMPTY": {}}
+    exec("\n".join(lines), namespace)
+    return namespace["_extract"]
+
+
 def extract_nested_fields_n_level(
     df: pd.DataFrame,
     nested_mapping: NestedMapping
 ) -> pd.DataFrame:
-
-    df = df.copy()
+    """Return a new frame (via assign) with the mapped nested fields added; the input is not modified."""
 
     for top_column, mapping in nested_mapping.items():
 
         if top_column not in df.columns:
             continue
 
-        extracted_series = df[top_column].apply(
-            lambda x: extract_from_dict(x, mapping)
-        )
+        columns = [name for name, _ in _flatten_mapping(mapping)]
+        extract = compile_extractor(mapping)
 
-        # Convert Series → list[dict] (Pylance-safe)
-        extracted_df = pd.json_normalize(extracted_series.tolist())
+        # Single pass over the column values with the compiled extractor
+        extracted = pd.DataFrame.from_records(
+            [extract(val) for val in df[top_column].values],
+            columns=columns,
+            index=df.index,
+        )
 
-        df = pd.concat([df, extracted_df], axis=1)
+        df = df.assign(**{name: extracted[name] for name in columns})
 
     return df
 
 def clean_soql_dataframe(df: pd.DataFrame, 
                         columns_to_drop: Optional[List[str]] = None,
-                        rename_columns: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+                        rename_columns: Optional[Dict[str, str]] = None,
+                        categorical_columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Clean DataFrame by dropping unwanted columns and renaming others.
     
@@ -103,11 +248,14 @@ def clean_soql_dataframe(df: pd.DataFrame,
         df: Input DataFrame
         columns_to_drop: List of columns to remove. Default: ['attributes']
         rename_columns: Dict mapping old column names to new names
+        categorical_columns: Columns (pre-rename names) to cast to 'category';
+                             missing columns are skipped
     
     Returns:
-        Cleaned DataFrame
+        Cleaned DataFrame. Only a shallow copy is taken, so column data is
+        shared with the input; the input itself is not modified.
     """
-    df = df.copy()
+    df = df.copy(deep=False)
     
     if columns_to_drop is None:
         columns_to_drop = ['attributes']
@@ -116,7 +264,11 @@ def clean_soql_dataframe(df: pd.DataFrame,
     if existing_cols_to_drop:
         df = df.drop(columns=existing_cols_to_drop)
     
+    for col in categorical_columns or []:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    
     if rename_columns:
-        df.rename(columns=rename_columns, inplace=True)
+        df = df.rename(columns=rename_columns)
     
     return df
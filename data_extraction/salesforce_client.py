@@ -1,11 +1,197 @@
+import os
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
 from simple_salesforce.api import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
+from urllib3.util.retry import Retry
+
+# Login credentials per live client, so an expired session can be renewed
+_CLIENT_CREDENTIALS = weakref.WeakKeyDictionary()
+
+# Serialises session renewal: the cached client is shared by every usecase
+# thread, and only the first one to see the expiry should log in again
+_RELOGIN_LOCK = threading.Lock()
+
+
+def _build_session():
+    """Keep-alive HTTP session with a connection pool sized for concurrent usecases."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+    )
+    session.mount("https://", adapter)
+    return session
+
 
+@lru_cache(maxsize=8)
 def get_salesforce_client(username, password, security_token):
-    return Salesforce(
+    """Log in once per credential tuple and reuse the session afterwards."""
+    sf = Salesforce(
         username=username,
         password=password,
-        security_token=security_token
+        security_token=security_token,
+        session=_build_session()
     )
+    _CLIENT_CREDENTIALS[sf] = (username, password, security_token)
+    return sf
+
+
+def _relogin(sf, expired_session_id):
+    """
+    Renew the session on `sf` in place after `expired_session_id` expired.
+
+    A thread that finds the session already renewed by another one reuses
+    it. The login builds a throwaway client outside the lru_cache, and only
+    its session id, headers and HTTP session are moved onto `sf`, so the
+    cached client stays the one registered instance.
+    """
+    credentials = _CLIENT_CREDENTIALS.get(sf)
+    if credentials is None:
+        return False
+
+    with _RELOGIN_LOCK:
+        if sf.session_id != expired_session_id:
+            return True
+
+        username, password, security_token = credentials
+        fresh = Salesforce(
+            username=username,
+            password=password,
+            security_token=security_token,
+            session=_build_session()
+        )
+        old_session = sf.session
+        sf.session_id = fresh.session_id
+        sf.headers = fresh.headers
+        sf.session = fresh.session
+        old_session.close()
+    return True
+
+
+def client_username(sf):
+    """Username `sf` logged in with, or "" for a client not built by get_salesforce_client."""
+    try:
+        credentials = _CLIENT_CREDENTIALS.get(sf)
+    except TypeError:  # not weak-referenceable, so never registered
+        return ""
+    return credentials[0] if credentials else ""
+
+
+def close_salesforce_clients():
+    """Close the pooled HTTP sessions of every cached client."""
+    for sf in list(_CLIENT_CREDENTIALS.keys()):
+        sf.session.close()
+    get_salesforce_client.cache_clear()
+
 
 def run_query(sf, query: str):
-    return sf.query_all(query)["records"]
+    """
+    Stream query records page by page instead of materialising query_all().
+
+    An expired session is renewed and the query retried once, as long as no
+    records have been handed to the caller yet.
+    """
+    session_id = sf.session_id
+    yielded = False
+    try:
+        for record in sf.query_all_iter(query):
+            yielded = True
+            yield record
+    except SalesforceExpiredSession:
+        if yielded or not _relogin(sf, session_id):
+            raise
+        yield from sf.query_all_iter(query)
+
+
+def run_bulk_query(sf, object_name: str, query: str):
+    """
+    Stream a large query through the Bulk API instead of REST query pages.
+
+    Records are yielded batch by batch as the job results come back. An
+    expired session is handled as in run_query().
+    """
+    def _records():
+        # sf.bulk builds a handler from the current session id on each access
+        for batch in getattr(sf.bulk, object_name).query(query, lazy_operation=True):
+            yield from batch
+
+    session_id = sf.session_id
+    yielded = False
+    try:
+        for record in _records():
+            yielded = True
+            yield record
+    except SalesforceExpiredSession:
+        if yielded or not _relogin(sf, session_id):
+            raise
+        yield from _records()
+
+
+class RateLimiter:
+    """
+    Adaptive pacing between Salesforce-heavy steps.
+
+    acquire() is a token bucket with a minimum gap between calls; throttle()
+    only backs off when the org's API usage (from the Sforce-Limit-Info
+    header) crosses `usage_threshold`, sleeping longer as quota runs out.
+    """
+
+    def __init__(
+        self,
+        requests_per_second=None,
+        min_interval=0.5,
+        usage_threshold=0.9,
+        max_delay=60.0,
+    ):
+        if requests_per_second is None:
+            requests_per_second = float(os.getenv("SF_REQUESTS_PER_SECOND", "2"))
+        self.rate = requests_per_second
+        self.capacity = max(1.0, requests_per_second)
+        self.tokens = self.capacity
+        self.min_interval = min_interval
+        self.usage_threshold = usage_threshold
+        self.max_delay = max_delay
+        self.updated = time.monotonic()
+        self.last_call = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and the minimum gap has passed."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(
+                -self.tokens / self.rate if self.tokens < 0 else 0.0,
+                self.last_call + self.min_interval - now,
+            )
+            self.last_call = now + max(wait, 0.0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, sf):
+        """Sleep only when the last response reported API usage above the threshold."""
+        usage = (getattr(sf, "api_usage", None) or {}).get("api-usage")
+        if usage is None or not usage.total:
+            return 0.0
+        ratio = usage.used / usage.total
+        if ratio <= self.usage_threshold:
+            return 0.0
+        # Scale from 0 at the threshold up to max_delay at full quota
+        pressure = min(1.0, (ratio - self.usage_threshold) / (1 - self.usage_threshold))
+        delay = self.max_delay * pressure
+        print(f"⚠ Salesforce API usage at {ratio:.0%}, pausing {delay:.1f}s")
+        time.sleep(delay)
+        return delay
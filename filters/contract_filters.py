@@ -1,33 +1,113 @@
+import numpy as np
 import pandas as pd
+from datetime import date
+from functools import lru_cache
 from pandas.tseries.offsets import Day
 
-today = pd.Timestamp.today().normalize()
+
+@lru_cache(maxsize=1)
+def _today_for(d: date):
+    """Normalised Timestamp for a calendar day; recomputed only when the day changes."""
+    return pd.Timestamp(d).normalize()
 
 def normalize_dates(df, columns):
     for col in columns:
         df[col] = (
-            pd.to_datetime(df[col], errors="coerce", utc=True)
+            pd.to_datetime(df[col], errors="coerce", utc=True, format="ISO8601", cache=True)
               .dt.tz_convert(None)   
               .dt.normalize()
         )
     return df
 
 def leakage_zombies(df, today=None):
+    """Activated contracts without a renewal that ended 30+ days ago (new frame from boolean indexing)."""
     if today is None:
-        today = pd.Timestamp.today().normalize()
+        today = _today_for(date.today())
+    cutoff = today - pd.Timedelta(days=30)
 
     return df.loc[
-        (df["EndDate"] <= today - pd.Timedelta(days=30)) &
+        (df["EndDate"] <= cutoff) &
         (df["Status"] == "Activated") &
         (df["SBQQ__RenewalOpportunity__c"].isna())
-    ].copy()
+    ]
+
+def expiring_soon_contracts(df, today=None):
+    """Activated contracts without a renewal ending within the last 30 days or later (new frame from boolean indexing)."""
+    if today is None:
+        today = _today_for(date.today())
+    cutoff = today - pd.Timedelta(days=30)
 
-def expiring_soon_contracts(df):
     return df.loc[
-       (df['EndDate'] >= (today - pd.Timedelta(days=30))) &
+       (df['EndDate'] >= cutoff) &
        (df['Status'] == 'Activated') &
        (df['SBQQ__RenewalOpportunity__c'].isna())
-    ].copy()
+    ]
+
+def classify_contracts(df, today=None):
+    """
+    Split contracts into zombie / warning / healthy in a single scan.
+
+    zombie:  Activated, no renewal opportunity, ended 30+ days ago
+    warning: Activated, no renewal opportunity, end date within the last 30 days or later
+    healthy: everything else
+
+    Returns {"zombie": df, "warning": df, "healthy": df} sliced from the input.
+    """
+    if today is None:
+        today = _today_for(date.today())
+
+    end = df["EndDate"].to_numpy().astype("datetime64[D]")
+    active = (
+        (df["Status"] == "Activated").to_numpy()
+        & df["SBQQ__RenewalOpportunity__c"].isna().to_numpy()
+    )
+    cutoff = np.datetime64(today - pd.Timedelta(days=30), "D")
+
+    zombie = active & (end <= cutoff)
+    warning = active & (end >= cutoff) & ~zombie
+    healthy = ~(zombie | warning)
+
+    return {
+        "zombie": df.iloc[np.flatnonzero(zombie)],
+        "warning": df.iloc[np.flatnonzero(warning)],
+        "healthy": df.iloc[np.flatnonzero(healthy)],
+    }
+
+# Operator dispatch: each returns a boolean Series for the column
+_OPERATORS = {
+    "isna": lambda s, v: s.isna(),
+    "notna": lambda s, v: s.notna(),
+    "=": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "in": lambda s, v: s.isin(v),
+    ">=": lambda s, v: s >= v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    "<": lambda s, v: s < v,
+}
+
+# Evaluation order: cheap / selective checks first, range comparisons last
+_OPERATOR_RANK = {
+    "isna": 0, "notna": 0, "=": 1, "in": 2, "!=": 3,
+    ">=": 4, "<=": 4, ">": 4, "<": 4,
+}
+
+
+def _iter_conditions(filters):
+    for column, condition in filters.items():
+        if isinstance(condition, dict):
+            for op, value in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported operator: {op}")
+                yield column, op, value
+        else:
+            # simple equality
+            yield column, "=", condition
+
+
+def _evaluate(series, op, value):
+    return _OPERATORS[op](series, value).to_numpy(dtype=bool, na_value=False)
+
 
 def apply_filters(df, filters: dict):
     """
@@ -40,6 +120,13 @@ def apply_filters(df, filters: dict):
     - null / not-null
     - comparison operators
 
+    Conditions are AND-ed into a single NumPy mask. With three or more
+    conditions, everything after the first is evaluated only on rows
+    that are still selected.
+
+    Returns a new frame from boolean indexing. It does not share memory
+    with ``df``, so callers may modify it.
+
     Example:
     filters = {
         "Status": "Activated",
@@ -48,44 +135,18 @@ def apply_filters(df, filters: dict):
     }
     """
 
-    mask = pd.Series(True, index=df.index)
-
-    for column, condition in filters.items():
-        if isinstance(condition, dict):
-            for op, value in condition.items():
-
-                if op == "isna":
-                    mask &= df[column].isna()
-
-                elif op == "notna":
-                    mask &= df[column].notna()
+    conditions = sorted(_iter_conditions(filters), key=lambda c: _OPERATOR_RANK[c[1]])
+    narrow = len(conditions) >= 3
 
-                elif op == "=":
-                    mask &= df[column] == value
-
-                elif op == "!=":
-                    mask &= df[column] != value
-
-                elif op == "in":
-                    mask &= df[column].isin(value)
-
-                elif op == ">=":
-                    mask &= df[column] >= value
-
-                elif op == "<=":
-                    mask &= df[column] <= value
-
-                elif op == ">":
-                    mask &= df[column] > value
-
-                elif op == "<":
-                    mask &= df[column] < value
-
-                else:
-                    raise ValueError(f"Unsupported operator: {op}")
+    mask = np.ones(len(df), dtype=bool)
 
+    for position, (column, op, value) in enumerate(conditions):
+        if narrow and position > 0:
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                break
+            mask[rows] = _evaluate(df[column].iloc[rows], op, value)
         else:
-            # simple equality
-            mask &= df[column] == condition
+            np.logical_and(mask, _evaluate(df[column], op, value), out=mask)
 
-    return df.loc[mask].copy()
+    return df.loc[mask]
@@ -1,17 +1,51 @@
 import sys
+# Usecase modules still print() directly, so keep stdout UTF-8 for them
 sys.stdout.reconfigure(encoding='utf-8')
 
+import atexit
+import logging
 import os
+import re
+import copy
 import importlib
-import traceback
-import pandas as pd
+import math
+import inspect
+import pkgutil
+import numpy as np
 from datetime import datetime
-from dotenv import load_dotenv
-import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+from pathlib import Path
+
+from data_extraction.salesforce_client import (
+    RateLimiter,
+    close_salesforce_clients,
+    get_salesforce_client
+)
+from report.pdf_pool import build_inline, report_owner, wait_for_reports
+from utils.output_dirs import ensure_dirs
+
+
+# ------------------------------------------------------------
+# Logging: plain stdout handler, so log lines stay in order with the
+# print() calls that usecases and helpers still make on the same stream
+# ------------------------------------------------------------
+
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
 
-from data_extraction.salesforce_client import get_salesforce_client
-from chart_generator.matplotlib_charts import generate_pie_chart, bar_chart_executive
-from report.report_generator import build_leakage_report,build_executive_report
+logger = logging.getLogger("rie")
+logger.setLevel(logging.INFO)
+logger.addHandler(_log_handler)
+logger.propagate = False
+
+
+def flush_logs():
+    """Flush stdout (pool workers exit without flushing it)."""
+    sys.stdout.flush()
+
+
+atexit.register(flush_logs)
 
 
 # ------------------------------------------------------------
@@ -51,33 +85,96 @@ CATEGORY_MAPPING = {
 }
 
 
+# ------------------------------------------------------------
+# ReportLab, matplotlib and pandas are imported where they are used, so
+# worker processes and partial runs don't pay for them at startup
+# ------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def _category_styles():
+    """Sample stylesheet plus the 10/14pt body style, built once per process."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Image,
-    PageBreak
-)
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+    styles = getSampleStyleSheet()
+    normal = ParagraphStyle(
+        "LeakNormal",
+        parent=styles["Normal"],
+        fontSize=10,
+        leading=14
+    )
+    return styles, normal
+
+# Chart height in the category reports (~500px in points)
+FIXED_HEIGHT = 300
+
+
+@lru_cache(maxsize=64)
+def _load_image(path, height):
+    """Size a chart to `height` from its header; callers must copy before use."""
+    from report.report_generator import CachedImage, image_size
+
+    img_width, img_height = image_size(path)
+    return CachedImage(path, width=height * img_width / img_height, height=height)
+
+
+# Category name -> folder/file name ("Pricing & Discount" -> "Pricing_and_Discount")
+_SLUG_TABLE = str.maketrans({" ": "_", "&": "and"})
 
 
-def build_category_from_central_assets(category_name, base_output_dir, usecase_list):
+@lru_cache(maxsize=None)
+def _slug(name):
+    return name.translate(_SLUG_TABLE)
 
-    chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    summary_dir = os.path.join(base_output_dir, "Data_Summary")
 
-    category_dir = os.path.join(
-        base_output_dir,
-        category_name.replace(" ", "_").replace("&", "and")
+# "title:" / "description:" lines of a usecase summary file
+_SUMMARY_RE = re.compile(r"^[ \t]*(title|description):[ \t]*(.*)$", re.MULTILINE)
+
+
+def _scan_assets(directory, suffix):
+    """Map file stem -> path for every `suffix` file in `directory` (one scandir pass)."""
+    try:
+        with os.scandir(directory) as entries:
+            return {
+                entry.name[:-len(suffix)]: entry.path
+                for entry in entries
+                if entry.name.endswith(suffix) and entry.is_file()
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def build_category_from_central_assets(category_name, usecase_list, base_output_dir):
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        PageBreak,
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer
     )
+
+    charts = _scan_assets(os.path.join(base_output_dir, "Data_Chart"), ".png")
+    summaries = _scan_assets(os.path.join(base_output_dir, "Data_Summary"), ".txt")
+
+    present = []
+    for usecase in usecase_list:
+        if usecase not in charts:
+            logger.info(f"⚠ Chart missing for {usecase}")
+        elif usecase not in summaries:
+            logger.info(f"⚠ Summary missing for {usecase}")
+        else:
+            present.append(usecase)
+
+    # Nothing to report: don't create the folder or an empty one-page PDF
+    if not present:
+        logger.info(f"⚠ Skipping empty category {category_name}")
+        flush_logs()
+        return
+
+    slug = _slug(category_name)
+    category_dir = os.path.join(base_output_dir, slug)
     os.makedirs(category_dir, exist_ok=True)
 
-    output_pdf = os.path.join(
-        category_dir,
-        f"{category_name.replace(' ', '_').replace('&','and')}.pdf"
-    )
+    output_pdf = os.path.join(category_dir, f"{slug}.pdf")
 
     # ---------- CLEAN MARGINS ----------
     doc = SimpleDocTemplate(
@@ -88,13 +185,9 @@ def build_category_from_central_assets(category_name, base_output_dir, usecase_l
         bottomMargin=40
     )
 
-    styles = getSampleStyleSheet()
+    styles, normal_style = _category_styles()
     title_style = styles["Title"]
     heading_style = styles["Heading2"]
-    normal_style = styles["Normal"]
-
-    normal_style.fontSize = 10
-    normal_style.leading = 14
 
     elements = []
 
@@ -102,44 +195,21 @@ def build_category_from_central_assets(category_name, base_output_dir, usecase_l
     elements.append(Paragraph(category_name, title_style))
     elements.append(Spacer(1, 0.4 * inch))
 
-    first_section = True
-
-    for usecase in usecase_list:
-
-        chart_path = os.path.join(chart_dir, f"{usecase}.png")
-        summary_path = os.path.join(summary_dir, f"{usecase}.txt")
-
-        if not os.path.exists(chart_path):
-            print(f"⚠ Chart missing for {usecase}")
-            continue
-
-        if not os.path.exists(summary_path):
-            print(f"⚠ Summary missing for {usecase}")
-            continue
+    for index, usecase in enumerate(present):
 
-        print(f"✓ Adding {usecase} to {category_name}")
+        logger.info(f"✓ Adding {usecase} to {category_name}")
 
         # Add PageBreak only AFTER first section
-        if not first_section:
+        if index:
             elements.append(PageBreak())
 
-        first_section = False
-
         # ---------- USECASE TITLE ----------
-        elements.append(
-            Paragraph(usecase.replace("_", " "), heading_style)
-        )
+        elements.append(Paragraph(usecase.replace("_", " "), heading_style))
         elements.append(Spacer(1, 0.3 * inch))
 
         # ---------- FIXED HEIGHT (500px equivalent) ----------
-        FIXED_HEIGHT = 300  # ~500px in points
-
-        img = Image(chart_path)
-
-        # Calculate proportional width
-        ratio = FIXED_HEIGHT / img.drawHeight
-        img.drawHeight = FIXED_HEIGHT
-        img.drawWidth = img.drawWidth * ratio
+        # Shallow copy: the cached flowable is shared between category reports
+        img = copy.copy(_load_image(charts[usecase], FIXED_HEIGHT))
 
         # If width exceeds page width, scale down again
         if img.drawWidth > doc.width:
@@ -152,31 +222,13 @@ def build_category_from_central_assets(category_name, base_output_dir, usecase_l
         elements.append(img)
         elements.append(Spacer(1, 0.3 * inch))
 
-        # ---------- SUMMARY ----------
-        with open(summary_path, "r", encoding="utf-8") as f:
-            summary_text = f.read()
-
-        # formatted = summary_text.replace("\n", "<br/>")
-        # elements.append(Paragraph(formatted, normal_style))
-        
         # ---------- SUMMARY CLEAN FORMAT ----------
-        with open(summary_path, "r", encoding="utf-8") as f:
-            raw_text = f.read()
+        raw_text = Path(summaries[usecase]).read_text(encoding="utf-8")
 
-        clean_lines = []
-
-        for line in raw_text.splitlines():
-            line = line.strip()
-
-            if line.startswith("title:"):
-                clean_lines.append(
-                    f"<b>{line.replace('title:', '').strip()}</b>"
-                )
-
-            elif line.startswith("description:"):
-                clean_lines.append(
-                    line.replace("description:", "").strip()
-                )
+        clean_lines = [
+            f"<b>{value.strip()}</b>" if key == "title" else value.strip()
+            for key, value in _SUMMARY_RE.findall(raw_text)
+        ]
 
         # Join cleaned lines
         formatted = "<br/><br/>".join(clean_lines)
@@ -185,38 +237,248 @@ def build_category_from_central_assets(category_name, base_output_dir, usecase_l
 
     doc.build(elements)
 
-    print(f"✓ Category Report Built: {category_name}")
+    logger.info(f"✓ Category Report Built: {category_name}")
+    # Pool workers exit without running atexit hooks
+    flush_logs()
 
 # ------------------------------------------------------------
 # Risk Classification Logic
 # ------------------------------------------------------------
 
-def classify_risk(count):
-    if count > 100:
-        return "High"
-    elif count > 25:
-        return "Medium"
-    else:
-        return "Low"
+# Loss thresholds (INR): <= 50k Low, <= 100k Medium, above that High
+_RISK_BINS = [-np.inf, 50000, 100000, np.inf]
+_RISK_LABELS = ["Low", "Medium", "High"]
+
+
+def _classify(series):
+    """Bucket a numeric Series into risk labels in one vectorised pass."""
+    import pandas as pd
+
+    return pd.cut(series, bins=_RISK_BINS, labels=_RISK_LABELS).astype(str)
+
+
+# ------------------------------------------------------------
+# Concurrent usecase execution
+# ------------------------------------------------------------
+
+# Usecases in flight at once; bounded by Salesforce concurrent-request limits
+MAX_CONCURRENT_USECASES = int(os.getenv("MAX_CONCURRENT_USECASES", "8"))
+# Each worker process logs in with its own Salesforce session; keep the number
+# of concurrent sessions within what the org tolerates
+MAX_USECASE_PROCESSES = int(os.getenv("MAX_USECASE_PROCESSES", "5"))
+# Budget per usecase; the run waits at most this long per wave of workers
+USECASE_TIMEOUT_SECONDS = 300
+# "thread" overlaps SOQL waits; "process" also spreads ReportLab/pandas CPU work over cores
+USECASE_EXECUTOR = os.getenv("USECASE_EXECUTOR", "thread")
+
+
+def _failed_result(module_name, error):
+    return {
+        "module": module_name,
+        "name": module_name,
+        "records_found": 0,
+        "loss": 0,
+        "revenue": 0,
+        "status": "failed",
+        "error": str(error)
+    }
+
+
+def load_usecase_registry():
+    """
+    Import every usecase module once and map its name to its run() callable.
+
+    Raises AttributeError up front for a module without run(), instead of
+    discovering it mid-run.
+    """
+    import usecase
+
+    runners = {}
+    for _, name, _ in sorted(pkgutil.iter_modules(usecase.__path__), key=lambda m: m.name):
+        if not name.startswith("usecase"):
+            continue
+        module = importlib.import_module(f"usecase.{name}")
+        if not hasattr(module, "run"):
+            raise AttributeError(f"{name} has no run() function")
+        runners[name] = module.run
+    return runners
+
+
+@lru_cache(maxsize=None)
+def _accepts_ctx(runner):
+    """Whether runner takes the shared ctx dict (older usecases are run(sf, base_output_dir))."""
+    return "ctx" in inspect.signature(runner).parameters
+
+
+def run_single_usecase(module_name, runner, sf, base_output_dir, limiter, ctx=None):
+    """Run one usecase, returning its summary row."""
+    limiter.acquire()
+    # Tags the PDFs this usecase queues, so a failed build fails its row
+    report_owner.set(module_name)
+    logger.info(f"\n▶ Running: {module_name}")
+    logger.info("-" * 60)
+
+    try:
+        if ctx is not None and _accepts_ctx(runner):
+            result = runner(sf, base_output_dir, ctx=ctx)
+        else:
+            result = runner(sf, base_output_dir)
+        limiter.throttle(sf)
+
+        logger.info(f"✓ Completed {module_name} | Records found: {result.get('records_found', 0)}")
+
+        return {
+            "module": module_name,
+            "name": result.get("name", module_name),
+            "records_found": result.get("records_found", 0),
+            "loss": result.get("total_loss", 0),
+            "revenue": result.get("total_revenue", 0),
+            "status": "success"
+        }
+
+    except Exception as e:
+        logger.exception(f"✗ Failed {module_name}: {e}")
+        return _failed_result(module_name, e)
+
+
+def _collect_results(pool, futures, max_workers):
+    """
+    Wait for the usecase futures against one run-wide deadline and return
+    their summary rows in submission order.
+
+    The deadline is USECASE_TIMEOUT_SECONDS per wave of `max_workers`
+    usecases. On timeout, queued usecases are cancelled and the pool is shut
+    down without waiting, so the summary and executive report are still
+    produced. A usecase already running cannot be interrupted: its worker
+    keeps going in the background and interpreter exit still waits for it.
+    """
+    timeout = USECASE_TIMEOUT_SECONDS * math.ceil(len(futures) / max_workers)
+    _, not_done = wait(futures.values(), timeout=timeout)
+    if not_done:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for module_name, future in futures.items():
+        if future in not_done:
+            logger.info(f"✗ Failed {module_name}: not finished within {timeout}s")
+            results.append(_failed_result(module_name, "timed out"))
+            continue
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.exception(f"✗ Failed {module_name}: {e}")
+            results.append(_failed_result(module_name, e))
+    return results
+
+
+def run_usecases_in_threads(runners, sf, base_output_dir, ctx=None):
+    """
+    Run the synchronous usecase modules on worker threads.
+
+    SOQL, Groq, Excel and PDF writes are mostly blocking I/O, so threads
+    overlap the waiting; the pool size caps how many hit Salesforce at once.
+    Results keep the discovery order.
+    """
+    limiter = RateLimiter()
+    max_workers = max(1, min(MAX_CONCURRENT_USECASES, len(runners)))
+
+    # Not a `with` block: its exit would join a timed-out worker and hang the run
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="usecase")
+    futures = {
+        module_name: pool.submit(
+            run_single_usecase, module_name, runner, sf, base_output_dir, limiter, ctx
+        )
+        for module_name, runner in runners.items()
+    }
+    results = _collect_results(pool, futures, max_workers)
+    pool.shutdown(wait=False)
+    return results
+
+
+def run_usecase(module_name, sf_config, base_output_dir, requests_per_second=None, ctx=None):
+    """
+    Process-pool entry point for one usecase.
+
+    The Salesforce client holds a live HTTP session and cannot be pickled,
+    so each worker logs in from the credential tuple and keeps its own
+    (per-process cached) client. Reports are built inline: the worker has
+    to wait for them before returning anyway.
+    """
+    build_inline()
+    try:
+        module = importlib.import_module(f"usecase.{module_name}")
+        sf = get_salesforce_client(*sf_config)
+        limiter = RateLimiter(requests_per_second=requests_per_second)
+        return run_single_usecase(module_name, module.run, sf, base_output_dir, limiter, ctx)
+    finally:
+        # Pool workers exit without running atexit hooks
+        flush_logs()
+
+
+def run_usecases_in_processes(module_names, sf_config, base_output_dir, ctx=None):
+    """
+    Run usecases in separate processes, one per module, in discovery order.
+
+    At most MAX_USECASE_PROCESSES workers (each with its own Salesforce
+    session) run at once; the SF_REQUESTS_PER_SECOND budget is split evenly
+    across them.
+    """
+    max_workers = max(1, min(
+        MAX_CONCURRENT_USECASES, MAX_USECASE_PROCESSES, len(module_names), os.cpu_count() or 1
+    ))
+    requests_per_second = float(os.getenv("SF_REQUESTS_PER_SECOND", "2")) / max_workers
+
+    # Forked workers inherit the stdout buffer; empty it so nothing prints twice
+    flush_logs()
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    futures = {
+        module_name: pool.submit(
+            run_usecase, module_name, sf_config, base_output_dir, requests_per_second, ctx
+        )
+        for module_name in module_names
+    }
+    results = _collect_results(pool, futures, max_workers)
+    pool.shutdown(wait=False)
+    return results
+
+
+def run_all_usecases(runners, sf_config, base_output_dir, executor=USECASE_EXECUTOR, ctx=None):
+    """
+    Run every registered usecase and return their summary rows in discovery order.
+
+    Args:
+        runners: Mapping of module name to run() callable (load_usecase_registry)
+        sf_config: (username, password, security_token) tuple
+        base_output_dir: Timestamped output directory of the run
+        executor: "thread" (default) or "process"
+        ctx: Shared run state from ensure_dirs, passed to usecases that accept it
+    """
+    if executor == "process":
+        return run_usecases_in_processes(list(runners), sf_config, base_output_dir, ctx)
+    return run_usecases_in_threads(runners, get_salesforce_client(*sf_config), base_output_dir, ctx)
 
 
 def main():
 
     # ------------------------------------------------------------
-    # 1. Load environment variables
+    # 1. Load environment variables (only if not already exported)
     # ------------------------------------------------------------
-    load_dotenv()
+    if "SF_USERNAME" not in os.environ:
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
 
     # ------------------------------------------------------------
-    # 2. Create Salesforce client once
+    # 2. Create Salesforce client once (cached; also fails fast on bad credentials)
     # ------------------------------------------------------------
-    print("Connecting to Salesforce...")
-    sf = get_salesforce_client(
+    logger.info("Connecting to Salesforce...")
+    sf_config = (
         os.getenv("SF_USERNAME"),
         os.getenv("SF_PASSWORD"),
         os.getenv("SF_TOKEN")
     )
-    print("Salesforce connection established.\n")
+    get_salesforce_client(*sf_config)
+    logger.info("Salesforce connection established.\n")
 
     # ------------------------------------------------------------
     # 3. Create base output directory (timestamped)
@@ -224,106 +486,89 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base_output_dir = os.path.join("output", timestamp)
     os.makedirs(base_output_dir, exist_ok=True)
-    print(f"Base output directory: {base_output_dir}\n")
+    # Data_Chart / Data_Summary are shared by every usecase; create them once
+    ctx = ensure_dirs(base_output_dir)
+    logger.info(f"Base output directory: {base_output_dir}\n")
 
     # ------------------------------------------------------------
     # 4. Auto-discover usecase modules
     # ------------------------------------------------------------
-    usecase_dir = os.path.join(os.path.dirname(__file__), "usecase")
-
-    usecase_modules = sorted([
-        f[:-3] for f in os.listdir(usecase_dir)
-        if f.startswith("usecase") and f.endswith(".py") and f != "__init__.py"
-    ])
+    runners = load_usecase_registry()
 
-    print(f"Discovered {len(usecase_modules)} use case(s):")
-    print(", ".join(usecase_modules))
-    print("=" * 60)
+    logger.info(f"Discovered {len(runners)} use case(s):")
+    logger.info(", ".join(runners))
+    logger.info("=" * 60)
 
     # ------------------------------------------------------------
-    # 5. Execute each usecase
+    # 5. Execute usecases concurrently
     # ------------------------------------------------------------
-    results = []
-
-    for module_name in usecase_modules:
-        print("Timeout: Waiting for 60 seconds...")
-        time.sleep(60)
-        print(f"\n▶ Running: {module_name}")
-        print("-" * 60)
-
-        try:
-            module = importlib.import_module(f"usecase.{module_name}")
+    results = run_all_usecases(runners, sf_config, base_output_dir, ctx=ctx)
 
-            if not hasattr(module, "run"):
-                raise AttributeError(f"{module_name} has no run() function")
-
-            result = module.run(sf, base_output_dir)
-
-            results.append({
-                "module": module_name,
-                "name": result.get("name", module_name),
-                "records_found": result.get("records_found", 0),
-                "loss": result.get("total_loss", 0),
-                "revenue": result.get("total_revenue", 0),
-                "status": "success"
-            })
-
-            print(f"✓ Completed | Records found: {result.get('records_found', 0)}")
-
-        except Exception as e:
-            results.append({
-                "module": module_name,
-                "name": module_name,
-                "records_found": 0,
-                "loss": 0,
-                "revenue": 0,
-                "status": "failed",
-                "error": str(e)
-            })
-            print(f"✗ Failed: {e}")
-            traceback.print_exc()
+    # A usecase whose PDF failed to build did not deliver its report
+    report_failures = wait_for_reports()
+    if report_failures:
+        logger.error(f"{len(report_failures)} report(s) failed to build")
+    failed_reports = {owner: error for owner, _, error in report_failures}
+    for i, r in enumerate(results):
+        if r["status"] == "success" and r["module"] in failed_reports:
+            results[i] = _failed_result(r["module"], failed_reports[r["module"]])
 
     # ------------------------------------------------------------
     # 6. Execution Summary
     # ------------------------------------------------------------
-    successful = [r for r in results if r["status"] == "success"]
-    failed = [r for r in results if r["status"] == "failed"]
+    # Successful rows are gathered column-wise so the frame is built without
+    # a list-of-dicts object block
+    successful = {"module": [], "name": [], "records_found": [], "loss": [], "revenue": []}
+    failed = []
+
+    for r in results:
+        if r["status"] != "success":
+            failed.append(r)
+            continue
+        for key, column in successful.items():
+            column.append(r[key])
 
-    print("\n" + "=" * 60)
-    print("EXECUTION SUMMARY")
-    print("=" * 60)
-    print(f"Total run:   {len(results)}")
-    print(f"Successful:  {len(successful)}")
-    print(f"Failed:      {len(failed)}")
+    logger.info("\n" + "=" * 60)
+    logger.info("EXECUTION SUMMARY")
+    logger.info("=" * 60)
+    logger.info(f"Total run:   {len(results)}")
+    logger.info(f"Successful:  {len(successful['module'])}")
+    logger.info(f"Failed:      {len(failed)}")
 
     # ------------------------------------------------------------
     # 7. Build Revenue Loss Report
     # ------------------------------------------------------------
 
-    if successful:
+    if successful["module"]:
+        import pandas as pd
+        from chart_generator.matplotlib_charts import bar_chart_executive
+        from report.report_generator import build_executive_report
+        from report.summary_store import save_summary
 
-        summary_df = pd.DataFrame(successful)
+        # Ensure numeric while building the columns
+        for key in ("loss", "revenue"):
+            successful[key] = np.nan_to_num(
+                np.asarray(pd.to_numeric(successful[key], errors="coerce"), dtype=np.float64)
+            )
 
-        # Ensure numeric
-        summary_df["loss"] = pd.to_numeric(summary_df["loss"], errors="coerce").fillna(0)
-        summary_df["revenue"] = pd.to_numeric(summary_df["revenue"], errors="coerce").fillna(0)
+        summary_df = pd.DataFrame(successful, copy=False)
 
         # Sort by highest loss
-        summary_df = summary_df.sort_values(by="loss", ascending=False).reset_index(drop=True)
+        summary_df = summary_df.sort_values(
+            by="loss", ascending=False, ignore_index=True, kind="stable"
+        )
 
         # Serial number
-        summary_df["S.NO."] = summary_df.index + 1
+        summary_df.insert(0, "S.NO.", np.arange(1, len(summary_df) + 1, dtype=np.int32))
 
         # Risk classification logic
-        def classify_loss_risk(loss):
-            if loss > 100000:
-                return "High"
-            elif loss > 50000:
-                return "Medium"
-            else:
-                return "Low"
+        summary_df["Risk Category"] = _classify(summary_df["loss"])
 
-        summary_df["Risk Category"] = summary_df["loss"].apply(classify_loss_risk)
+        # Keep a machine-readable copy of the run for downstream tooling
+        try:
+            save_summary(summary_df, base_output_dir)
+        except ImportError:
+            logger.info("⚠ pyarrow not installed; skipping summary.parquet")
 
         # KPI calculations
         total_loss = summary_df["loss"].sum()
@@ -343,23 +588,13 @@ def main():
         bar_chart_path = os.path.join(base_output_dir, "loss_bar_chart.png")
 
         bar_chart_path = bar_chart_executive(
-            usecase_names=summary_df["name"].tolist(),
-            losses=summary_df["loss"].tolist(),
+            usecase_names=usecase_names,
+            losses=losses,
             output_path=bar_chart_path
         )
 
         # Prepare table data
-        table_data = [
-            ["S.NO.", "Dimension", "Total Loss (INR)", "Risk Category"]
-        ]
-
-        for _, row in summary_df.iterrows():
-            table_data.append([
-                row["S.NO."],
-                row["name"],
-                f"{row['loss']:,.2f}",
-                row["Risk Category"]
-            ])
+        table_df = summary_df[["S.NO.", "name", "loss", "Risk Category"]]
 
         # Generate Revenue Loss Report
         build_executive_report(
@@ -367,29 +602,36 @@ def main():
             usecase_names=usecase_names,
             losses=losses,
             kpi_values=kpis,
-            table_data=table_data,
+            table_data=table_df,
             chart_path=bar_chart_path
         )
 
 
-        print("\n✓ Revenue Loss Report generated successfully.")
+        logger.info("\n✓ Revenue Loss Report generated successfully.")
 
     # ------------------------------------------------------------
     # 8. Category Reports (Optional)
     # ------------------------------------------------------------
 
-    if successful:
-        for category_name, usecase_list in CATEGORY_MAPPING.items():
-            build_category_from_central_assets(
-                category_name,
-                base_output_dir,
-                usecase_list
-            )
-
-    print("\n" + "=" * 60)
-    print(f"All output saved under: {base_output_dir}")
-    print("=" * 60)
+    if successful["module"]:
+        # Each category PDF is independent and CPU-bound, so build them in parallel
+        max_workers = min(len(CATEGORY_MAPPING), os.cpu_count() or 1)
+        flush_logs()  # forked workers would otherwise re-emit pending output
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(
+                partial(build_category_from_central_assets, base_output_dir=base_output_dir),
+                CATEGORY_MAPPING.keys(),
+                CATEGORY_MAPPING.values()
+            ))
+
+    logger.info("\n" + "=" * 60)
+    logger.info(f"All output saved under: {base_output_dir}")
+    logger.info("=" * 60)
 
 # =============================================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        wait_for_reports()
+        close_salesforce_clients()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter  # noqa: F401  (streaming writer, preferred when installed)
+    XLSX_ENGINE = "xlsxwriter"
+except ImportError:
+    XLSX_ENGINE = "openpyxl"
+
+# The large healthy/other segments are only exported when REI_WRITE_HEALTHY_XLSX=1
+WRITE_HEALTHY_XLSX = os.getenv("REI_WRITE_HEALTHY_XLSX", "0") == "1"
+
+
+def _excel_value(value):
+    """Map a pandas cell to something a write-only openpyxl sheet accepts."""
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        # Excel has no time zones
+        return value.replace(tzinfo=None)
+    if isinstance(value, (dict, list)):
+        return str(value)
+    return value
+
+
+def _excel_column(series: pd.Series) -> list:
+    """
+    Convert one column to Excel-ready Python values in a single pass.
+
+    Plain numpy int/bool/float columns go straight through
+    to_numpy(copy=False).tolist(); only object-like columns (strings,
+    categoricals, datetimes, nested dicts) are coerced value by value.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        values = series.to_numpy(copy=False)
+        if dtype.kind == "f" and np.isnan(values).any():
+            return [None if value != value else value for value in values.tolist()]
+        return values.tolist()
+    return [_excel_value(value) for value in series.tolist()]
+
+
+def write_excel(df: pd.DataFrame, path: str) -> str:
+    """
+    Write a DataFrame to .xlsx row by row instead of building the workbook in memory.
+
+    Uses xlsxwriter in constant_memory mode when available, otherwise an
+    openpyxl write-only workbook.
+
+    Args:
+        df: Frame to export (index is not written)
+        path: Destination .xlsx path
+
+    Returns:
+        The written path
+    """
+    if XLSX_ENGINE == "xlsxwriter":
+        with pd.ExcelWriter(
+            path,
+            engine="xlsxwriter",
+            engine_kwargs={"options": {"constant_memory": True}}
+        ) as writer:
+            df.to_excel(writer, index=False)
+        return path
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([str(column) for column in df.columns])
+    columns = [_excel_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    for row in zip(*columns):
+        sheet.append(row)
+    workbook.save(path)
+    return path
@@ -0,0 +1,80 @@
+import contextvars
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger("rie")
+
+# ReportLab layout is pure Python and single-threaded; two workers keep it off
+# the usecase threads without starving the Salesforce/Groq work
+PDF_WORKERS = 2
+
+# Usecase that queued a report, so a failed PDF can be charged to its row
+report_owner = contextvars.ContextVar("report_owner", default=None)
+
+_pdf_pool = None
+_pending = []
+_lock = threading.Lock()
+_inline = False
+
+
+def build_inline(enabled=True):
+    """
+    Build reports on the calling thread instead of the background pool.
+
+    Used by usecase worker processes, which must block on their PDFs anyway;
+    spawning a pool per usecase there only adds start-up cost.
+    """
+    global _inline
+    _inline = enabled
+
+
+def submit_report(builder, **kwargs):
+    """
+    Queue builder(**kwargs) on the background PDF pool and return its future.
+
+    Workers are spawned rather than forked: usecases run on threads, and a
+    fork taken while another thread holds a lock (stdout, logging) can hang.
+    In inline mode the report is built immediately and errors propagate.
+    """
+    global _pdf_pool
+    if _inline:
+        return builder(**kwargs)
+
+    with _lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        future = _pdf_pool.submit(builder, **kwargs)
+        _pending.append((report_owner.get(), kwargs.get("output_pdf"), future))
+    return future
+
+
+def wait_for_reports():
+    """
+    Block until every queued PDF is written, then shut the pool down.
+
+    Returns:
+        (owner, output_pdf, error) for each report that failed; owner is
+        the report_owner value at submit time
+    """
+    global _pdf_pool
+    with _lock:
+        pending = _pending[:]
+        _pending.clear()
+        pool, _pdf_pool = _pdf_pool, None
+
+    failed = []
+    for owner, output_pdf, future in pending:
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"✗ Report failed: {output_pdf}: {e}")
+            failed.append((owner, output_pdf, str(e)))
+
+    if pool is not None:
+        pool.shutdown(wait=True)
+    return failed
@@ -13,31 +13,56 @@ from reportlab.lib.units import inch
 from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Paragraph, Image, Spacer
 from typing import Optional, List
+from functools import lru_cache
+import numbers
 import os
+import re
+import pandas as pd
 from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
-import matplotlib.pyplot as plt
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
 # ============================================================
 
-def format_inr(amount):
-    """Format number into Indian numbering format."""
-    amount = float(str(amount).replace(",", ""))
-    s = f"{amount:.2f}"
-    integer, decimal = s.split(".")
+# ------------------------------------------------------------
+# Decoded-image cache shared by every report built in this process
+# ------------------------------------------------------------
+_READER_CACHE = {}
 
-    if len(integer) > 3:
-        last3 = integer[-3:]
-        rest = integer[:-3]
-        rest = ",".join([rest[max(i-2,0):i] for i in range(len(rest), 0, -2)][::-1])
-        integer = rest + "," + last3
 
-    return integer + "." + decimal
+def cached_image_reader(path):
+    """Return one ImageReader per (path, mtime) so a chart is decoded once."""
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    reader = _READER_CACHE.get(key)
+    if reader is None:
+        reader = _READER_CACHE.setdefault(key, ImageReader(path))
+    return reader
+
+
+@lru_cache(maxsize=256)
+def _get_image_size(path, mtime):
+    return cached_image_reader(path).getSize()
 
 
+def image_size(path):
+    """(width, height) in pixels, memoised per (path, mtime)."""
+    return _get_image_size(os.path.abspath(path), os.path.getmtime(path))
+
+
+class CachedImage(Image):
+    """Image flowable that reuses the process-wide ImageReader for its file."""
+
+    def __getattr__(self, a):
+        if a == "_img" and isinstance(self.__dict__.get("_file"), str):
+            self._img = cached_image_reader(self._file)
+            return self._img
+        return super().__getattr__(a)
+
+
+@lru_cache(maxsize=1)
 def create_custom_styles():
-    """Create and return custom paragraph styles for the report."""
+    """Create and return custom paragraph styles for the report (shared; do not mutate)."""
     styles = getSampleStyleSheet()
     
     title_style = ParagraphStyle(
@@ -103,14 +128,13 @@ def add_chart_section(story, image_path, figure_caption, styles, max_width):
         raise FileNotFoundError(f"Chart image not found: {image_path}")
 
     # Read image size
-    img_reader = ImageReader(image_path)
-    img_width, img_height = img_reader.getSize()
+    img_width, img_height = image_size(image_path)
 
     # Constrain image
     max_height = 4 * inch
     scale = min(max_width / img_width, max_height / img_height)
 
-    img = Image(
+    img = CachedImage(
         image_path,
         width=img_width * scale,
         height=img_height * scale,
@@ -152,53 +176,120 @@ def create_table_style(background_color='#FA5053'):
     )
 
 
-def add_table_section(story, table_data, table_title, background_color, styles, page_width=None):
+# Body cells match the table's Helvetica 8pt; Paragraph is only used to wrap
+BODY_CELL_STYLE = ParagraphStyle(
+    "BodyCell",
+    parent=create_custom_styles()["body"],
+    fontSize=8,
+    leading=10,
+)
+_CELL_PADDING = 8  # LEFTPADDING + RIGHTPADDING in create_table_style
+_PLAIN_CELL_MAX_CHARS = 40  # fallback when the column width is unknown
+
+# Row cap for the large "healthy"/"other" segment tables in the PDFs
+MAX_PDF_ROWS = int(os.getenv("REI_MAX_PDF_ROWS", "500"))
+
+
+def _cell_text(cell_data, is_money=False):
+    """Render one cell value: strings as-is, amounts in INR grouping, rest via str()."""
+    if isinstance(cell_data, str):
+        return cell_data
+    if is_money:
+        if cell_data is None:
+            return ""
+        if isinstance(cell_data, numbers.Real) and not isinstance(cell_data, bool):
+            # NaN != NaN: missing amounts render blank, like format_inr_series
+            return format_inr(cell_data) if cell_data == cell_data else ""
+    return str(cell_data)
+
+
+def _body_cell(cell_data, col_width=None, is_money=False):
+    """Plain string when the value fits on one line, else a wrapping Paragraph."""
+    text = _cell_text(cell_data, is_money)
+    if "<" in text or "&" in text or "\n" in text:
+        return Paragraph(text, BODY_CELL_STYLE)
+    if col_width is None:
+        fits = len(text) < _PLAIN_CELL_MAX_CHARS
+    else:
+        fits = stringWidth(text, "Helvetica", 8) <= col_width - _CELL_PADDING
+    return text if fits else Paragraph(text, BODY_CELL_STYLE)
+
+
+def add_table_section(
+    story,
+    table_data,
+    table_title,
+    background_color,
+    styles,
+    page_width=None,
+    col_widths=None,
+    pre_wrapped=False,
+    max_rows=None,
+):
     """Add table section to report with custom title and background color.
     
     Args:
         story: ReportLab story list
-        table_data: Table data (list of lists)
+        table_data: DataFrame, or table data as list of lists (header row first)
         table_title: Title for the table
         background_color: Hex color for header
         styles: Styles dict
         page_width: Available page width for table
+        col_widths: Precomputed column widths; derived from page_width if omitted
+        pre_wrapped: Rows already hold final cell values (strings/Paragraphs)
+        max_rows: Render at most this many body rows, with a note giving the total
     """
     story.append(Spacer(1, 12))
     story.append(Paragraph(table_title, styles["heading2"]))
     story.append(Spacer(1, 8))
     
-    # Create body cell style for text wrapping
-    body_cell_style = ParagraphStyle(
-        "BodyCell",
-        parent=styles["body"],
-        fontSize=8,
-        leading=10,
-    )
-    
-    # Convert table data to use Paragraphs for text wrapping
-    converted_data = []
-    for row_idx, row in enumerate(table_data):
-        converted_row = []
-        for cell_data in row:
-            if row_idx == 0:  # Header row
-                converted_row.append(str(cell_data))
-            else:
-                # Convert to Paragraph for text wrapping
-                converted_row.append(Paragraph(str(cell_data), body_cell_style))
-        converted_data.append(converted_row)
-    
+    # DataFrames are read row by row; no list-of-lists copy is built first
+    if isinstance(table_data, pd.DataFrame):
+        total_rows = len(table_data)
+        if max_rows is not None:
+            table_data = table_data.head(max_rows)
+        header_row = table_data.columns.tolist()
+        body_rows = table_data.itertuples(index=False, name=None)
+    elif table_data:
+        total_rows = len(table_data) - 1
+        header_row = table_data[0]
+        body_rows = table_data[1:max_rows + 1 if max_rows is not None else None]
+    else:
+        total_rows = 0
+        header_row = None
+        body_rows = []
+
     # Calculate column widths to fit page
-    if page_width and len(converted_data) > 0:
-        num_cols = len(converted_data[0])
-        col_width = page_width / num_cols
-        col_widths = [col_width] * num_cols
+    if col_widths is None and page_width and header_row:
+        num_cols = len(header_row)
+        col_widths = [page_width / num_cols] * num_cols
+    col_width = col_widths[0] if col_widths else None
+
+    if pre_wrapped:
+        converted_data = [list(header_row), *body_rows] if header_row else []
     else:
-        col_widths = None
+        # Header stays plain; body cells only become Paragraphs when they need wrapping
+        header = [str(cell_data) for cell_data in header_row] if header_row else []
+        # Amount columns are detected once per table from the header
+        money_cols = ["Amount" in name for name in header]
+        converted_data = [header] if header_row else []
+        converted_data.extend(
+            [
+                _body_cell(cell_data, col_width, is_money)
+                for cell_data, is_money in zip(row, money_cols)
+            ]
+            for row in body_rows
+        )
     
     table = Table(converted_data, colWidths=col_widths, repeatRows=1)
     table.setStyle(create_table_style(background_color))
     
     story.append(table)
+    if max_rows is not None and total_rows > max_rows:
+        story.append(Spacer(1, 4))
+        story.append(Paragraph(
+            f"<i>Showing the first {max_rows:,} of {total_rows:,} rows.</i>", styles["body"]
+        ))
     story.append(Spacer(1, 8))
 
 
@@ -207,18 +298,33 @@ def add_multiple_table_sections(story, tables_list, styles, page_width=None):
     
     Args:
         story: ReportLab story list
-        tables_list: List of dicts with keys: 'data', 'title', 'background_color'
+        tables_list: List of dicts with keys: 'data' (DataFrame or list of
+            lists), 'title', 'background_color' (optional 'pre_wrapped',
+            'max_rows')
         styles: Styles dict
         page_width: Available page width for tables
     """
+    # Equal-width columns, computed once per column count
+    widths_by_cols = {}
     for table_info in tables_list:
+        data = table_info['data']
+        col_widths = None
+        num_cols = data.shape[1] if isinstance(data, pd.DataFrame) else len(data[0]) if data else 0
+        if page_width and num_cols:
+            if num_cols not in widths_by_cols:
+                widths_by_cols[num_cols] = [page_width / num_cols] * num_cols
+            col_widths = widths_by_cols[num_cols]
+
         add_table_section(
             story,
-            table_info['data'],
+            data,
             table_info['title'],
             table_info['background_color'],
             styles,
-            page_width
+            page_width,
+            col_widths=col_widths,
+            pre_wrapped=table_info.get('pre_wrapped', False),
+            max_rows=table_info.get('max_rows'),
         )
 
 
@@ -233,6 +339,7 @@ def add_footer_section(story, csv_download_link, styles):
     '''
     story.append(Paragraph(footer_html, styles["body"]))
 
+@lru_cache(maxsize=32)
 def get_segment_title_style(base_style, color_hex):
     return ParagraphStyle(
         name=f"SegmentTitle_{color_hex}",
@@ -367,17 +474,50 @@ def build_leakage_report(
 
 def format_inr(amount):
     """Format number into Indian numbering format."""
-    amount = float(str(amount).replace(",", ""))
+    if isinstance(amount, str):
+        amount = amount.replace(",", "")
+    return _format_inr_cached(float(amount))
+
+
+# A comma after every digit followed by an even run of digits plus the last three
+_INR_RE = re.compile(r"(\d)(?=(\d\d)*\d\d\d$)")
+
+
+@lru_cache(maxsize=4096)
+def _format_inr_cached(amount: float):
     s = f"{amount:.2f}"
     integer, decimal = s.split(".")
+    integer = _INR_RE.sub(r"\1,", integer)
+    return integer + "." + decimal
 
-    if len(integer) > 3:
-        last3 = integer[-3:]
-        rest = integer[:-3]
-        rest = ",".join([rest[max(i-2,0):i] for i in range(len(rest), 0, -2)][::-1])
-        integer = rest + "," + last3
+# Same grouping as _INR_RE, anchored on the decimal point of "1234567.00"
+_INR_SERIES_RE = re.compile(r"(\d)(?=(\d\d)*\d\d\d\.)")
+
+
+def format_inr_series(values):
+    """
+    Format a whole column into Indian numbering in one pass.
+
+    Args:
+        values: Series (or array-like) of amounts; non-numeric/NaN become ""
+
+    Returns:
+        Series of formatted strings aligned with the input
+    """
+    amounts = pd.to_numeric(pd.Series(values), errors="coerce")
+    # object dtype keeps .str usable when every value is missing (or none exist)
+    formatted = amounts.map("{:.2f}".format, na_action="ignore").astype(object)
+    formatted = formatted.str.replace(_INR_SERIES_RE, r"\1,", regex=True)
+    return formatted.fillna("")
+
+# Risk category -> (R, A, G) tick cells of the executive RAG table
+_RAG_TICKS = {
+    "high": ("✓", "", ""),
+    "medium": ("", "✓", ""),
+    "low": ("", "", "✓"),
+}
+_NO_TICKS = ("", "", "")
 
-    return integer + "." + decimal
 
 def build_executive_report(
     output_pdf: str,
@@ -387,20 +527,23 @@ def build_executive_report(
     table_data=None,
     chart_path=None,
 ):
-    from reportlab.platypus import (
-        SimpleDocTemplate,
-        Paragraph,
-        Spacer,
-        Table,
-        TableStyle,
-        Image,
-    )
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    import matplotlib.pyplot as plt
-    import os
+    """
+    Build the one-page executive revenue loss report.
+
+    Args:
+        output_pdf: Path of the PDF to write
+        usecase_names: Usecase display names (bar chart order)
+        losses: Loss per usecase
+        kpi_values: [total_loss, loss_percentage]
+        table_data: DataFrame with S.NO., name, loss and risk columns (in that
+            order), or the legacy list of rows with a header row first
+        chart_path: Pre-rendered executive bar chart image
+
+    Raises:
+        FileNotFoundError: If chart_path does not exist
+    """
+    if not chart_path or not os.path.exists(chart_path):
+        raise FileNotFoundError(f"Executive bar chart not found: {chart_path}")
 
     doc = SimpleDocTemplate(
         output_pdf,
@@ -486,23 +629,21 @@ def build_executive_report(
     story.append(Spacer(1, 30))
 
     # ================= BAR CHART =================
-    if chart_path and os.path.exists(chart_path):
-        story.append(Image(chart_path, width=width, height=4 * inch))
-    else:
-        # fallback: generate chart internally
-        plt.figure(figsize=(8, 5))
-        plt.barh(usecase_names, losses)
-        plt.tight_layout()
-        temp_chart = "temp_bar_chart.png"
-        plt.savefig(temp_chart, bbox_inches="tight")
-        plt.close()
-        story.append(Image(temp_chart, width=width, height=4 * inch))
+    story.append(CachedImage(chart_path, width=width, height=4 * inch))
 
     story.append(Spacer(1, 30))
 
     # ================= SIMPLE RAG MATRIX TABLE =================
 
-    if table_data:
+    if isinstance(table_data, pd.DataFrame):
+        # (S.NO., name, loss, risk) columns, iterated as plain tuples
+        rows = list(table_data.itertuples(index=False, name=None))
+        has_table = not table_data.empty
+    else:
+        rows = table_data[1:] if table_data else []
+        has_table = bool(table_data)
+
+    if has_table:
 
         header_style = ParagraphStyle(
             "header",
@@ -540,25 +681,26 @@ def build_executive_report(
         ])
 
         # ---- DATA ----
-        for row in table_data[1:]:
-
-            sr = row[0]
-            name = row[1]
-            loss = row[2]
-            risk = row[3].lower()
+        # R/A/G tick columns resolved for every row up front
+        ticks = [_RAG_TICKS.get(str(row[3]).lower(), _NO_TICKS) for row in rows]
+
+        # Only "✓" and "" ever appear, so each R/A/G column shares two
+        # Paragraphs across all rows (one set per column: widths differ)
+        r_cells, a_cells, g_cells = (
+            {text: Paragraph(text, tick_style) for text in ("✓", "")}
+            for _ in range(3)
+        )
 
-            r_tick = "✓" if risk == "high" else ""
-            a_tick = "✓" if risk == "medium" else ""
-            g_tick = "✓" if risk == "low" else ""
+        for (sr, name, loss, _), (r_tick, a_tick, g_tick) in zip(rows, ticks):
 
             formatted_table.append([
                 Paragraph(str(sr), cell_style),
                 Paragraph(str(name), cell_style),
                 # Paragraph(f"INR {loss}", cell_style),
                 Paragraph(f"INR {format_inr(loss)}", cell_style),
-                Paragraph(r_tick, tick_style),
-                Paragraph(a_tick, tick_style),
-                Paragraph(g_tick, tick_style),
+                r_cells[r_tick],
+                a_cells[a_tick],
+                g_cells[g_tick],
             ])
 
         col_widths = [
@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+
+SUMMARY_FILENAME = "summary.parquet"
+
+
+def save_summary(summary_df: pd.DataFrame, base_output_dir: str) -> str:
+    """
+    Persist the per-usecase run summary next to the reports.
+
+    Args:
+        summary_df: Executive summary table (one row per successful usecase)
+        base_output_dir: Timestamped output directory of the run
+
+    Returns:
+        Path of the written Parquet file
+    """
+    path = os.path.join(base_output_dir, SUMMARY_FILENAME)
+    summary_df.to_parquet(path, engine="pyarrow", index=False, compression="zstd")
+    return path
+
+
+def load_summary(path: str) -> pd.DataFrame:
+    """
+    Read a saved run summary back into pandas.
+
+    Args:
+        path: summary.parquet file or the run's output directory
+
+    Returns:
+        DataFrame whose numeric columns share buffers with the Arrow table
+        where possible
+    """
+    import pyarrow.parquet as pq
+
+    if os.path.isdir(path):
+        path = os.path.join(path, SUMMARY_FILENAME)
+
+    table = pq.read_table(path)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
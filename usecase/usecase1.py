@@ -2,12 +2,15 @@ import sys
 sys.stdout.reconfigure(encoding='utf-8')
  
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from data_extraction.salesforce_client import run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields, clean_soql_dataframe
-from filters.contract_filters import normalize_dates, leakage_zombies, expiring_soon_contracts
+from data_extraction.loaders import (
+    records_to_df, extract_nested_fields, clean_soql_dataframe, SALESFORCE_CATEGORICAL_COLUMNS
+)
+from filters.contract_filters import normalize_dates, classify_contracts
 from chart_generator.matplotlib_charts import zombie_analysis_chart
-from report.report_generator import build_leakage_report
+from report.report_generator import build_leakage_report, format_inr_series
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
  
  
@@ -33,39 +36,37 @@ def run(sf, base_output_dir):
     today = pd.Timestamp.today().normalize()
  
     # ----------------------------------------------------------------
-    # 2. Fetch contracts and apply filters
+    # 2. Fetch contracts (dates and table details in one query)
     # ----------------------------------------------------------------
     query = """
         SELECT Id, StartDate, EndDate, Status,
-               SBQQ__RenewalOpportunity__c, SBQQ__Opportunity__r.Amount
+               SBQQ__RenewalOpportunity__c, Account.Name,
+               SBQQ__Opportunity__r.Name, SBQQ__Opportunity__r.Amount
         FROM Contract
     """
     records = run_query(sf, query)
-    df = records_to_df(records)
-    df = normalize_dates(df, ["EndDate"])
- 
-    leakage_df = leakage_zombies(df)
-    expiring_soon_contracts_df = expiring_soon_contracts(df)
- 
+    contracts_df = records_to_df(records)
+
     # ----------------------------------------------------------------
-    # 3. Generate chart
+    # 3. Apply filters and generate chart
     # ----------------------------------------------------------------
+    df = clean_soql_dataframe(contracts_df, categorical_columns=SALESFORCE_CATEGORICAL_COLUMNS)
+    df = normalize_dates(df, ["StartDate", "EndDate"])
+ 
+    contract_classes = classify_contracts(df)
+    leakage_df = contract_classes["zombie"]
+    expiring_soon_contracts_df = contract_classes["warning"]
+ 
     chart_path = zombie_analysis_chart(
-        df_all_contracts=df,
-        df_zombie_contracts=leakage_df,
-        df_expiring_soon=expiring_soon_contracts_df,
+        counts={label: len(part) for label, part in contract_classes.items()},
+        zombie_start_dates=leakage_df["StartDate"].to_numpy(),
         output_path=os.path.join(output_dir, "The_Zombie_Renewal.png")
     )
  
     # ----------------------------------------------------------------
-    # 4. Fetch detailed contract data for tables
+    # 4. Project detail columns for tables
     # ----------------------------------------------------------------
-    detail_query = """      
-        SELECT Id, Account.Name, SBQQ__Opportunity__r.Name,SBQQ__Opportunity__r.Amount, Status
-        FROM Contract
-    """
-    records = run_query(sf, detail_query)
-    df = records_to_df(records)
+    df = contracts_df[["Id", "Account", "SBQQ__Opportunity__r", "Status"]]
  
     # Extract nested relationship fields
     nested_mapping = {
@@ -87,32 +88,49 @@ def run(sf, base_output_dir):
     # ----------------------------------------------------------------
     # 5. Split into categories
     # ----------------------------------------------------------------
-    leakage_df_details = df[df.index.isin(leakage_df.index)].copy()
-    expiring_soon_df_details = df[df.index.isin(expiring_soon_contracts_df.index)].copy()
-    healthy_df = df[
-        ~df.index.isin(leakage_df.index) &
-        ~df.index.isin(expiring_soon_contracts_df.index)
-    ].copy()
+    # One hash lookup per category; zombie wins if a contract is in both
+    leak_mask = df.index.isin(leakage_df.index)
+    exp_mask = df.index.isin(expiring_soon_contracts_df.index) & ~leak_mask
+    healthy_mask = ~(leak_mask | exp_mask)
+
+    leakage_df_details = df[leak_mask]
+    expiring_soon_df_details = df[exp_mask]
+    healthy_df = df[healthy_mask]
  
     # ----------------------------------------------------------------
-    # 6. Save Excel files
+    # 6. Save export files
     # ----------------------------------------------------------------
-    leakage_df_details.to_excel(
-        os.path.join(output_dir, "zombie_leakage_contracts.xlsx"), index=False
-    )
-    expiring_soon_df_details.to_excel(
-        os.path.join(output_dir, "warning_subscriptions.xlsx"), index=False
-    )
-    healthy_df.to_excel(
-        os.path.join(output_dir, "healthy_subscriptions.xlsx"), index=False
-    )
+    # Healthy contracts are usually the bulk of the org, so they go to CSV
+    # rather than through the much slower openpyxl writer
+    exports = [
+        (leakage_df_details, "zombie_leakage_contracts.xlsx"),
+        (expiring_soon_df_details, "warning_subscriptions.xlsx"),
+        (healthy_df, "healthy_subscriptions.csv"),
+    ]
+
+    def _export(item):
+        part, filename = item
+        path = os.path.join(output_dir, filename)
+        if filename.endswith(".csv"):
+            # BOM so Excel picks up UTF-8 account names when opening the file
+            part.to_csv(path, index=False, encoding="utf-8-sig")
+        else:
+            part.to_excel(path, index=False)
+
+    with ThreadPoolExecutor(max_workers=len(exports)) as executor:
+        list(executor.map(_export, exports))
  
     # ----------------------------------------------------------------
     # 7. Build table data for PDF
     # ----------------------------------------------------------------
-    zombie_table_data  = [leakage_df_details.columns.tolist()]       + leakage_df_details.values.tolist()
-    warning_table_data = [expiring_soon_df_details.columns.tolist()] + expiring_soon_df_details.values.tolist()
-    healthy_table_data = [healthy_df.columns.tolist()]               + healthy_df.values.tolist()
+    def _table_rows(part):
+        # Format amounts for the whole column at once rather than per cell;
+        # the report reads the frame's rows directly
+        return part.assign(**{"Opportunity Amount": format_inr_series(part["Opportunity Amount"]).to_numpy()})
+
+    zombie_table_data  = _table_rows(leakage_df_details)
+    warning_table_data = _table_rows(expiring_soon_df_details)
+    healthy_table_data = _table_rows(healthy_df)
  
     tables_list = [
         {
@@ -234,15 +252,18 @@ def run(sf, base_output_dir):
     print(f"\n✓ Report generated:              {os.path.join(output_dir, 'The_Zombie_Renewal.pdf')}")
     print(f"✓ Zombie Leakage Contracts ({len(leakage_df_details)}):  zombie_leakage_contracts.xlsx")
     print(f"✓ Warning Subscriptions ({len(expiring_soon_df_details)}):       warning_subscriptions.xlsx")
-    print(f"✓ Healthy Subscriptions ({len(healthy_df)}):         healthy_subscriptions.xlsx")
+    print(f"✓ Healthy Subscriptions ({len(healthy_df)}):         healthy_subscriptions.csv")
     print("\nAll files are ready for download.")
  
     # ----------------------------------------------------------------
     # 11. Return summary for main.py
     # ----------------------------------------------------------------
+    leakage_sum = leakage_df_details["Opportunity Amount"].sum()
+    total_sum = df["Opportunity Amount"].sum()
+
     return {
         "name": "The_Zombie_Renewal",
         "records_found": len(leakage_df),
-        "total_revenue": df["Opportunity Amount"].sum() - leakage_df_details["Opportunity Amount"].sum(),
-        "total_loss": leakage_df_details["Opportunity Amount"].sum()
+        "total_revenue": total_sum - leakage_sum,
+        "total_loss": leakage_sum
     }
\ No newline at end of file
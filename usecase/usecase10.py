@@ -1,12 +1,15 @@
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df
-from filters.contract_filters import apply_filters
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query
 from chart_generator.matplotlib_charts import generate_pie_chart
-from report.report_generator import build_leakage_report
+from report.report_generator import build_leakage_report, MAX_PDF_ROWS
+from report.excel_export import write_excel, WRITE_HEALTHY_XLSX
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +22,17 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Opportunity fields queried -> report column names
+OPPORTUNITY_COLUMNS = {
+    "Id": "Opportunity ID",
+    "Name": "Opportunity Name",
+    "AccountId": "Account ID",
+    "StageName": "Stage Name",
+    "CloseDate": "Close Date",
+}
 
-def run(sf, base_output_dir):
+
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -30,60 +42,62 @@ def run(sf, base_output_dir):
     os.makedirs(output_dir, exist_ok=True)
 
     # ------------------------------------------------------------------
-    # Query 1: Renewal With Renewal Quote
+    # Query: Renewal Opportunities + Opportunities with a Renewal Quote
     # ------------------------------------------------------------------
 
-    query = """
+    # One pass over Opportunity split locally, instead of separate IN / NOT IN
+    # sub-select queries over the same rows
+    opportunity_query = """
     SELECT Id, Name, AccountId, StageName, CloseDate
     FROM Opportunity
     WHERE Name LIKE 'Renewal%'
-    AND Id IN (
-        SELECT SBQQ__Opportunity2__c
-        FROM SBQQ__Quote__c
-        WHERE SBQQ__Type__c = 'Renewal'
-        AND SBQQ__Opportunity2__c != NULL
-    )
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
+    # Only quotes on renewal opportunities can match, so filter on the parent
+    # server-side instead of pulling every renewal quote in the org
+    quote_query = """
+    SELECT SBQQ__Opportunity2__c
+    FROM SBQQ__Quote__c
+    WHERE SBQQ__Type__c = 'Renewal'
+    AND SBQQ__Opportunity2__c != NULL
+    AND SBQQ__Opportunity2__r.Name LIKE 'Renewal%'
+    """
+
+    quote_opp_ids = set(
+        cached_query(sf, quote_query, columns=["SBQQ__Opportunity2__c"])["SBQQ__Opportunity2__c"]
+    )
 
-    df = df.rename(columns={
-        "Id": "Opportunity ID",
-        "Name": "Opportunity Name",
-        "AccountId": "Account ID",
-        "StageName": "Stage Name",
-        "CloseDate": "Close Date",
+    # Fixed schema: only the queried fields become columns (no "attributes"),
+    # and an empty result still has them
+    df_all = cached_query(
+        sf, opportunity_query, columns=list(OPPORTUNITY_COLUMNS)
+    ).rename(columns=OPPORTUNITY_COLUMNS).astype({
+        # Few distinct stages; stored as codes instead of one str per row
+        "Stage Name": "category",
     })
 
-    df['Close Date'] = pd.to_datetime(df['Close Date'])
+    # Hash semi/anti-join against the id set: the "with quote" rows and their
+    # left-only complement, without a merge copy or indicator column
+    has_quote = df_all["Opportunity ID"].isin(quote_opp_ids)
+
+    # Renewal With Renewal Quote
+    df = df_all[has_quote].astype({"Close Date": "datetime64[ns]"})
+
+    # Renewal Without Renewal Quote (Close Date kept as the YYYY-MM-DD string)
+    df2 = df_all[~has_quote]
 
     # ------------------------------------------------------------------
-    # Query 2: Renewal Without Renewal Quote
+    # Shared asset folders for category-level reports
     # ------------------------------------------------------------------
 
-    query2 = """
-    SELECT Id, Name, AccountId, StageName, CloseDate
-    FROM Opportunity
-    WHERE Name LIKE 'Renewal%'
-    AND Id NOT IN (
-        SELECT SBQQ__Opportunity2__c
-        FROM SBQQ__Quote__c
-        WHERE SBQQ__Type__c = 'Renewal'
-        AND SBQQ__Opportunity2__c != NULL
-    )
-    """
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
 
-    records2 = run_query(sf, query2)
-    df2 = records_to_df(records2)
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
 
-    df2 = df2.rename(columns={
-        "Id": "Opportunity ID",
-        "Name": "Opportunity Name",
-        "AccountId": "Account ID",
-        "StageName": "Stage Name",
-        "CloseDate": "Close Date",
-    })
+    USECASE_NAME = "Renewal_Without_Renewal_Quote"
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
@@ -93,104 +107,62 @@ def run(sf, base_output_dir):
         labels=PIE_LABELS,
         values=[len(df2), len(df)],
         output_path=os.path.join(output_dir, "Renewal_Without_Renewal_Quote.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     # ------------------------------------------------------------------
-    # Save Excel Files
+    # Save Excel Files and request AI summary
     # ------------------------------------------------------------------
 
-    df.to_excel(
-        os.path.join(output_dir, "renewal_with_renewal_quote_opportunities.xlsx"),
-        index=False
-    )
-
-    df2.to_excel(
-        os.path.join(output_dir, "renewal_without_renewal_quote_opportunities.xlsx"),
-        index=False
-    )
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(df2),
+                PIE_LABELS[1]: len(df)
+            },
+            segment_filters={
+                PIE_LABELS[0]: f"{opportunity_query}AND Id NOT IN ({quote_query})",
+                PIE_LABELS[1]: f"{opportunity_query}AND Id IN ({quote_query})",
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, df2, os.path.join(output_dir, "renewal_without_renewal_quote_opportunities.xlsx")),
+        ]
+        # The large healthy segment is skipped unless REI_WRITE_HEALTHY_XLSX=1
+        if WRITE_HEALTHY_XLSX:
+            sink_futures.append(
+                executor.submit(write_excel, df, os.path.join(output_dir, "renewal_with_renewal_quote_opportunities.xlsx"))
+            )
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    renewal_without_quote_table = (
-        [df2.columns.to_list()] +
-        df2.values.tolist()
-    )
-
-    renewal_with_quote_table = (
-        [df.columns.to_list()] +
-        df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": renewal_without_quote_table,
+            "data": df2,
             "title": f"Renewal Without Renewal Quote ({len(df2)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": renewal_with_quote_table,
+            "data": df,
             "title": f"Renewal With Renewal Quote ({len(df)})",
-            "background_color": PIE_COLORS[1]
+            "background_color": PIE_COLORS[1],
+            "max_rows": MAX_PDF_ROWS
         }
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(df2),
-            PIE_LABELS[1]: len(df)
-        },
-        segment_filters={
-            PIE_LABELS[0]: query2,
-            PIE_LABELS[1]: query,
-        },
-        columns=df.columns.tolist()
-    )
-
-        # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "Renewal_Without_Renewal_Quote"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -219,7 +191,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "Renewal_Without_Renewal_Quote.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -1,12 +1,18 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query, cached_total
+from data_extraction.loaders import normalize_relationship
 from filters.contract_filters import apply_filters
 from chart_generator.matplotlib_charts import generate_pie_chart
-from report.report_generator import build_leakage_report
+from report.report_generator import build_leakage_report, MAX_PDF_ROWS
+from report.excel_export import write_excel, WRITE_HEALTHY_XLSX
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +25,11 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Quote line fields queried (relationships arrive as nested records)
+QUOTE_LINE_FIELDS = ["Id", "SBQQ__Product__r", "SBQQ__RequiredBy__r", "SBQQ__NetPrice__c"]
 
-def run(sf, base_output_dir):
+
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -29,10 +38,8 @@ def run(sf, base_output_dir):
     output_dir = os.path.join(base_output_dir, "usecase_11")
     os.makedirs(output_dir, exist_ok=True)
 
-    today = pd.Timestamp.today().normalize()
-
     # ------------------------------------------------------------------
-    # Query
+    # Query (component lines only; filtered server-side, Bulk API)
     # ------------------------------------------------------------------
 
     query = """
@@ -42,40 +49,42 @@ def run(sf, base_output_dir):
            SBQQ__RequiredBy__r.SBQQ__ProductName__c,
            SBQQ__NetPrice__c
     FROM SBQQ__QuoteLine__c
+    WHERE SBQQ__Product__r.SBQQ__Component__c = TRUE
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
+    # Only component lines are fetched; the revenue total still covers
+    # every quote line
+    total_query = """
+    SELECT SUM(SBQQ__NetPrice__c) total
+    FROM SBQQ__QuoteLine__c
+    """
 
-    df = extract_nested_fields(
-        df,
-        {
-            'SBQQ__Product__r': {
-                'Name': 'Product Name',
-                'SBQQ__Component__c': 'Product Component'
-            },
-            'SBQQ__RequiredBy__r': {
-                'SBQQ__ProductName__c': 'Required By Product Name'
-            }
-        }
+    df = cached_query(
+        sf, query, columns=QUOTE_LINE_FIELDS, object_name="SBQQ__QuoteLine__c"
     )
 
-    df = df.rename(columns={
-        "Id": "Quote Line ID",
-        "SBQQ__NetPrice__c": "Net Price",
-    })
-
-    df = df.drop(columns=["SBQQ__Product__r", "SBQQ__RequiredBy__r"])
+    # Each relationship is normalised once and the final frame is built in a
+    # single concat (no assign/drop/rename intermediates)
+    df = pd.concat([
+        df[["Id", "SBQQ__NetPrice__c"]].rename(columns={
+            "Id": "Quote Line ID",
+            "SBQQ__NetPrice__c": "Net Price",
+        }),
+        normalize_relationship(df["SBQQ__Product__r"], {
+            "Name": "Product Name",
+            "SBQQ__Component__c": "Product Component",
+        }),
+        normalize_relationship(df["SBQQ__RequiredBy__r"], {
+            "SBQQ__ProductName__c": "Required By Product Name",
+        }),
+    ], axis=1).astype({"Required By Product Name": "category"})
 
     # ------------------------------------------------------------------
     # Apply Filters
     # ------------------------------------------------------------------
 
-    overall_filter = {
-        "Product Component": {"=": True},
-    }
-
-    filtered_df = apply_filters(filters=overall_filter, df=df)
+    # Non-component lines are already excluded by the query's WHERE clause
+    filtered_df = df
 
     required_by_product_filter = {
         "Required By Product Name": {"isna": True}
@@ -95,6 +104,19 @@ def run(sf, base_output_dir):
         df=filtered_df
     )
 
+    # ------------------------------------------------------------------
+    # Shared asset folders for category-level reports
+    # ------------------------------------------------------------------
+
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
+
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
+
+    USECASE_NAME = "The_Broken_Bundle"
+
     # ------------------------------------------------------------------
     # Generate Pie Chart
     # ------------------------------------------------------------------
@@ -106,106 +128,64 @@ def run(sf, base_output_dir):
             len(required_by_product_present_df)
         ],
         output_path=os.path.join(output_dir, "The_Broken_Bundle.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     assert os.path.exists(chart_path), "Pie chart image was not generated"
 
     # ------------------------------------------------------------------
-    # Save Excel Files
+    # Save Excel Files and request AI summary
     # ------------------------------------------------------------------
 
-    required_by_product_not_present_df.to_excel(
-        os.path.join(output_dir, "broken_bundle_line_items.xlsx"),
-        index=False
-    )
-
-    required_by_product_present_df.to_excel(
-        os.path.join(output_dir, "other_quote_lines.xlsx"),
-        index=False
-    )
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(required_by_product_not_present_df),
+                PIE_LABELS[1]: len(required_by_product_present_df),
+            },
+            segment_filters={
+                PIE_LABELS[0]: required_by_product_filter,
+                PIE_LABELS[1]: required_by_product_present_filter
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, required_by_product_not_present_df, os.path.join(output_dir, "broken_bundle_line_items.xlsx")),
+        ]
+        # The large healthy segment is skipped unless REI_WRITE_HEALTHY_XLSX=1
+        if WRITE_HEALTHY_XLSX:
+            sink_futures.append(
+                executor.submit(write_excel, required_by_product_present_df, os.path.join(output_dir, "other_quote_lines.xlsx"))
+            )
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    broken_bundle_table = (
-        [required_by_product_not_present_df.columns.tolist()] +
-        required_by_product_not_present_df.values.tolist()
-    )
-
-    others_table = (
-        [required_by_product_present_df.columns.tolist()] +
-        required_by_product_present_df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": broken_bundle_table,
+            "data": required_by_product_not_present_df,
             "title": f"The Broken Bundle ({len(required_by_product_not_present_df)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": others_table,
+            "data": required_by_product_present_df,
             "title": f"Other Quote Lines ({len(required_by_product_present_df)})",
-            "background_color": PIE_COLORS[1]
+            "background_color": PIE_COLORS[1],
+            "max_rows": MAX_PDF_ROWS
         },
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(required_by_product_not_present_df),
-            PIE_LABELS[1]: len(required_by_product_present_df),
-        },
-        segment_filters={
-            PIE_LABELS[0]: required_by_product_filter,
-            PIE_LABELS[1]: required_by_product_present_filter
-        },
-        columns=df.columns.tolist()
-    )
-
-        # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "The_Broken_Bundle"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -234,7 +214,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "The_Broken_Bundle.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -248,9 +230,12 @@ def run(sf, base_output_dir):
         pie_segments=pie_segments,
     )
 
+    leakage_sum = required_by_product_not_present_df["Net Price"].sum()
+    total_sum = cached_total(sf, total_query)
+
     return {
         "name": "The_Broken_Bundle",
         "records_found": len(required_by_product_not_present_df),
-        "total_revenue": df["Net Price"].sum() - required_by_product_not_present_df["Net Price"].sum(),
-        "total_loss": required_by_product_not_present_df["Net Price"].sum()
+        "total_revenue": total_sum - leakage_sum,
+        "total_loss": leakage_sum
     }
\ No newline at end of file
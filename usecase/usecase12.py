@@ -1,12 +1,15 @@
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields
-from filters.contract_filters import apply_filters
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query
 from chart_generator.matplotlib_charts import generate_pie_chart, bar_chart
-from report.report_generator import build_leakage_report
+from report.report_generator import build_leakage_report, MAX_PDF_ROWS
+from report.excel_export import write_excel, WRITE_HEALTHY_XLSX
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +22,19 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Quote fields queried -> report column names
+QUOTE_COLUMNS = {
+    "Id": "Quote ID",
+    "Name": "Quote Name",
+    "SBQQ__CustomerDiscount__c": "Customer Discount",
+    "SBQQ__Status__c": "Status",
+    "SBQQ__NetAmount__c": "Net Amount",
+    "SBQQ__Opportunity2__c": "Opportunity ID",
+    "CreatedDate": "Created Date",
+}
 
-def run(sf, base_output_dir):
+
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -29,8 +43,6 @@ def run(sf, base_output_dir):
     output_dir = os.path.join(base_output_dir, "usecase_12")
     os.makedirs(output_dir, exist_ok=True)
 
-    today = pd.Timestamp.today().normalize()
-
     # ------------------------------------------------------------------
     # Query
     # ------------------------------------------------------------------
@@ -41,17 +53,12 @@ def run(sf, base_output_dir):
     FROM SBQQ__Quote__c
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
-
-    df = df.rename(columns={
-        "Id": "Quote ID",
-        "Name": "Quote Name",
-        "SBQQ__CustomerDiscount__c": "Customer Discount",
-        "SBQQ__Status__c": "Status",
-        "SBQQ__NetAmount__c" : "Net Amount",
-        "SBQQ__Opportunity2__c": "Opportunity ID",
-        "CreatedDate": "Created Date"
+    df = cached_query(
+        sf, query, columns=list(QUOTE_COLUMNS)
+    ).rename(columns=QUOTE_COLUMNS).astype({
+        "Customer Discount": "float64",
+        # Low-cardinality; the != "Approved" mask compares integer codes
+        "Status": "category",
     })
 
     # ------------------------------------------------------------------
@@ -63,19 +70,26 @@ def run(sf, base_output_dir):
         "Status": {"!=": "Approved"}
     }
 
-    discount_without_approval_df = apply_filters(
-        filters=discount_without_approval_filter,
-        df=df
-    )
+    # The two segments split the not-approved quotes on one discount mask
+    # (NaN > 20 is False, so quotes without a discount count as healthy)
+    not_approved = (df["Status"] != "Approved").to_numpy()
+    over_discount = (df["Customer Discount"] > 20).to_numpy()
 
-    healthy_quotes_df = df[
-        (
-            (df["Customer Discount"] < 20) |
-            (df["Customer Discount"].isna())
-        )
-        &
-        (df["Status"] != "Approved")
-    ]
+    discount_without_approval_df = df[not_approved & over_discount]
+    healthy_quotes_df = df[not_approved & ~over_discount]
+
+    # ------------------------------------------------------------------
+    # Shared asset folders for category-level reports
+    # ------------------------------------------------------------------
+
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
+
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
+
+    USECASE_NAME = "Discount_Without_Approval"
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
@@ -88,106 +102,64 @@ def run(sf, base_output_dir):
             len(healthy_quotes_df)
         ],
         output_path=os.path.join(output_dir, "Discount_Without_Approval.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     # ------------------------------------------------------------------
-    # Save Excel Files
-    # ------------------------------------------------------------------
-
-    discount_without_approval_df.to_excel(
-        os.path.join(output_dir, "discount_without_approval_quotes.xlsx"),
-        index=False
-    )
-
-    healthy_quotes_df.to_excel(
-        os.path.join(output_dir, "healthy_quotes.xlsx"),
-        index=False
-    )
+    # Save Excel Files and request AI summary
+    # ------------------------------------------------------------------
+
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(discount_without_approval_df),
+                PIE_LABELS[1]: len(healthy_quotes_df)
+            },
+            segment_filters={
+                PIE_LABELS[0]: discount_without_approval_filter,
+                PIE_LABELS[1]: {
+                    "Custom Filter": "~(df['Customer Discount'] > 20) & (df['Status'] != 'Approved')"
+                }
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, discount_without_approval_df, os.path.join(output_dir, "discount_without_approval_quotes.xlsx")),
+        ]
+        # The large healthy segment is skipped unless REI_WRITE_HEALTHY_XLSX=1
+        if WRITE_HEALTHY_XLSX:
+            sink_futures.append(
+                executor.submit(write_excel, healthy_quotes_df, os.path.join(output_dir, "healthy_quotes.xlsx"))
+            )
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    discount_without_approval_table = (
-        [discount_without_approval_df.columns.tolist()] +
-        discount_without_approval_df.values.tolist()
-    )
-
-    healthy_quotes_table = (
-        [healthy_quotes_df.columns.tolist()] +
-        healthy_quotes_df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": discount_without_approval_table,
+            "data": discount_without_approval_df,
             "title": f"Discount Without Approval ({len(discount_without_approval_df)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": healthy_quotes_table,
+            "data": healthy_quotes_df,
             "title": f"Healthy Quotes ({len(healthy_quotes_df)})",
-            "background_color": PIE_COLORS[1]
+            "background_color": PIE_COLORS[1],
+            "max_rows": MAX_PDF_ROWS
         }
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(discount_without_approval_df),
-            PIE_LABELS[1]: len(healthy_quotes_df)
-        },
-        segment_filters={
-            PIE_LABELS[0]: discount_without_approval_filter,
-            PIE_LABELS[1]: {
-                "Custom Filter": "(df['Customer Discount'] < 20) |(df['Customer Discount'].isna())&df['Status'] != 'Approved'"
-            }
-        },
-        columns=df.columns.tolist()
-    )
-
-        # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "Discount_Without_Approval"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -216,7 +188,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "Discount_Without_Approval.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -230,9 +204,12 @@ def run(sf, base_output_dir):
         pie_segments=pie_segments,
     )
 
+    leakage_sum = discount_without_approval_df["Net Amount"].sum()
+    total_sum = df["Net Amount"].sum()
+
     return {
         "name": "Discount_Without_Approval",
         "records_found": len(discount_without_approval_df),
-        "total_revenue": df["Net Amount"].sum() - discount_without_approval_df["Net Amount"].sum(),
-        "total_loss": discount_without_approval_df["Net Amount"].sum()
+        "total_revenue": total_sum - leakage_sum,
+        "total_loss": leakage_sum
     }
\ No newline at end of file
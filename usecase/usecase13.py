@@ -1,12 +1,17 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields
-from filters.contract_filters import apply_filters
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query, cached_total
+from data_extraction.loaders import extract_nested_fields
 from chart_generator.matplotlib_charts import generate_pie_chart, bar_chart
 from report.report_generator import build_leakage_report
+from report.excel_export import write_excel
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +24,14 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Quote line fields queried, in SELECT order
+QUOTE_LINE_FIELDS = [
+    "Id", "Name", "SBQQ__Quote__c", "SBQQ__NetTotal__c",
+    "SBQQ__ProductName__c", "SBQQ__BillingFrequency__c", "SBQQ__SubscriptionType__c",
+]
+
 
-def run(sf, base_output_dir):
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -40,10 +51,18 @@ def run(sf, base_output_dir):
            SBQQ__ProductName__c, SBQQ__BillingFrequency__c,
            SBQQ__SubscriptionType__c
     FROM SBQQ__QuoteLine__c
+    WHERE SBQQ__SubscriptionType__c = 'Renewable'
+    """
+
+    # Both segments are renewable lines, so only those are fetched; the
+    # revenue total still covers every quote line
+    total_query = """
+    SELECT SUM(SBQQ__NetTotal__c) total
+    FROM SBQQ__QuoteLine__c
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
+    # Shared per-process/on-disk cache; the fixed columns drop "attributes"
+    df = cached_query(sf, query, columns=QUOTE_LINE_FIELDS)
 
     df = df.rename(columns={
         "Id": "Quote Line Item ID",
@@ -61,6 +80,9 @@ def run(sf, base_output_dir):
     # Filters
     # ------------------------------------------------------------------
 
+    # Descriptive only: these dicts tell the AI summary what each segment
+    # holds. The query's WHERE clause keeps renewable lines and the mask
+    # below does the split, so keep all three in step.
     missing_billing_frequency_filter = {
         "Subscription Type": {"=": "Renewable"},
         "Billing Frequency": {"isna": True}
@@ -71,15 +93,24 @@ def run(sf, base_output_dir):
         "Billing Frequency": {"notna": True}
     }
 
-    missing_billing_frequency_df = apply_filters(
-        filters=missing_billing_frequency_filter,
-        df=df
-    )
+    # Every fetched line is renewable, so one Billing Frequency mask splits them
+    missing_frequency = df["Billing Frequency"].isna().to_numpy()
 
-    healthy_df = apply_filters(
-        df=df,
-        filters=healthy_filter
-    )
+    missing_billing_frequency_df = df[missing_frequency]
+    healthy_df = df[~missing_frequency]
+
+    # ------------------------------------------------------------------
+    # Shared asset folders for category-level reports
+    # ------------------------------------------------------------------
+
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
+
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
+
+    USECASE_NAME = "Missing_Billing_Frequency"
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
@@ -92,104 +123,57 @@ def run(sf, base_output_dir):
             len(healthy_df)
         ],
         output_path=os.path.join(output_dir, "Missing_Billing_Frequency.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     # ------------------------------------------------------------------
-    # Save Excel Files
+    # Save Excel Files and request AI summary
     # ------------------------------------------------------------------
 
-    missing_billing_frequency_df.to_excel(
-        os.path.join(output_dir, "missing_billing_frequency_quote_lines.xlsx"),
-        index=False
-    )
-
-    healthy_df.to_excel(
-        os.path.join(output_dir, "healthy_quote_lines.xlsx"),
-        index=False
-    )
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(missing_billing_frequency_df),
+                PIE_LABELS[1]: len(healthy_df)
+            },
+            segment_filters={
+                PIE_LABELS[0]: missing_billing_frequency_filter,
+                PIE_LABELS[1]: healthy_filter,
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, missing_billing_frequency_df, os.path.join(output_dir, "missing_billing_frequency_quote_lines.xlsx")),
+            executor.submit(write_excel, healthy_df, os.path.join(output_dir, "healthy_quote_lines.xlsx")),
+        ]
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    missing_billing_frequency_table = (
-        [missing_billing_frequency_df.columns.tolist()] +
-        missing_billing_frequency_df.values.tolist()
-    )
-
-    healthy_table = (
-        [healthy_df.columns.tolist()] +
-        healthy_df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": missing_billing_frequency_table,
+            "data": missing_billing_frequency_df,
             "title": f"Discount Without Approval ({len(missing_billing_frequency_df)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": healthy_table,
+            "data": healthy_df,
             "title": f"Healthy Quotes ({len(healthy_df)})",
             "background_color": PIE_COLORS[1]
         }
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(missing_billing_frequency_df),
-            PIE_LABELS[1]: len(healthy_df)
-        },
-        segment_filters={
-            PIE_LABELS[0]: missing_billing_frequency_filter,
-            PIE_LABELS[1]: healthy_filter,
-        },
-        columns=df.columns.tolist()
-    )
-
-        # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "Missing_Billing_Frequency"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -219,7 +203,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "Missing_Billing_Frequency.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -236,6 +222,6 @@ def run(sf, base_output_dir):
     return {
         "name": "Missing_Billing_Frequency",
         "records_found": len(missing_billing_frequency_df),
-        "total_revenue": df["Net Total"].sum() - missing_billing_frequency_df["Net Total"].sum(),
+        "total_revenue": cached_total(sf, total_query) - missing_billing_frequency_df["Net Total"].sum(),
         "total_loss": missing_billing_frequency_df["Net Total"].sum()
     }
\ No newline at end of file
@@ -1,12 +1,17 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields
-from filters.contract_filters import apply_filters
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query
+from data_extraction.loaders import normalize_relationship
 from chart_generator.matplotlib_charts import generate_pie_chart, bar_chart
 from report.report_generator import build_leakage_report
+from report.excel_export import write_excel
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +24,11 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Quote fields queried (the opportunity arrives as a nested record)
+QUOTE_FIELDS = ["Id", "Name", "SBQQ__NetAmount__c", "SBQQ__Opportunity2__r"]
 
-def run(sf, base_output_dir):
+
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -41,17 +49,16 @@ def run(sf, base_output_dir):
     WHERE SBQQ__Primary__c = TRUE AND SBQQ__Opportunity2__c != NULL
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
+    # Shared per-process/on-disk cache; the fixed columns drop "attributes"
+    df = cached_query(sf, query, columns=QUOTE_FIELDS)
 
-    df = extract_nested_fields(
-        df,
-        {
-            "SBQQ__Opportunity2__r": {
-                "Amount": "Opportunity Amount"
-            }
-        }
-    )
+    # Relationship flattened in one json_normalize pass, replacing the nested column
+    df = pd.concat([
+        df.drop(columns=["SBQQ__Opportunity2__r"]),
+        normalize_relationship(df["SBQQ__Opportunity2__r"], {
+            "Amount": "Opportunity Amount",
+        }),
+    ], axis=1)
 
     df = df.rename(columns={
         "Id": "Quote ID",
@@ -60,19 +67,29 @@ def run(sf, base_output_dir):
         "SBQQ__SubscriptionType__c": "Subscription Type"
     })
 
-    df.drop(columns=["SBQQ__Opportunity2__r"], inplace=True)
-
     # ------------------------------------------------------------------
     # Split Data
     # ------------------------------------------------------------------
 
-    healthy_df = df[
-        df["Net Amount"] == df["Opportunity Amount"]
-    ].copy()
+    # One comparison for both segments (a missing amount is never in sync,
+    # exactly as with !=)
+    in_sync = (df["Net Amount"] == df["Opportunity Amount"]).to_numpy()
+
+    healthy_df = df[in_sync]
+    unsynced_primary_quote_df = df[~in_sync]
+
+    # ------------------------------------------------------------------
+    # Shared asset folders for category-level reports
+    # ------------------------------------------------------------------
+
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
 
-    unsynced_primary_quote_df = df[
-        df["Net Amount"] != df["Opportunity Amount"]
-    ].copy()
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
+
+    USECASE_NAME = "Unsynced_Primary_Quote"
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
@@ -85,104 +102,57 @@ def run(sf, base_output_dir):
             len(healthy_df)
         ],
         output_path=os.path.join(output_dir, "Unsynced_Primary_Quote.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     # ------------------------------------------------------------------
-    # Save Excel Files
+    # Save Excel Files and request AI summary
     # ------------------------------------------------------------------
 
-    unsynced_primary_quote_df.to_excel(
-        os.path.join(output_dir, "unsynced_primary_quotes.xlsx"),
-        index=False
-    )
-
-    healthy_df.to_excel(
-        os.path.join(output_dir, "healthy_quote.xlsx"),
-        index=False
-    )
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(unsynced_primary_quote_df),
+                PIE_LABELS[1]: len(healthy_df)
+            },
+            segment_filters={
+                PIE_LABELS[0]: {"df": '''df["Net Amount"] != df["Opportunity Amount"]''', "query": query},
+                PIE_LABELS[1]: {"df": '''df["Net Amount"] == df["Opportunity Amount"]''', "query": query},
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, unsynced_primary_quote_df, os.path.join(output_dir, "unsynced_primary_quotes.xlsx")),
+            executor.submit(write_excel, healthy_df, os.path.join(output_dir, "healthy_quote.xlsx")),
+        ]
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    unsynced_primary_quote_table = (
-        [unsynced_primary_quote_df.columns.tolist()] +
-        unsynced_primary_quote_df.values.tolist()
-    )
-
-    healthy_table = (
-        [healthy_df.columns.tolist()] +
-        healthy_df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": unsynced_primary_quote_table,
+            "data": unsynced_primary_quote_df,
             "title": f"Unsynced Primary Quotes ({len(unsynced_primary_quote_df)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": healthy_table,
+            "data": healthy_df,
             "title": f"Healthy Quotes ({len(healthy_df)})",
             "background_color": PIE_COLORS[1]
         }
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(unsynced_primary_quote_df),
-            PIE_LABELS[1]: len(healthy_df)
-        },
-        segment_filters={
-            PIE_LABELS[0]: {"df": '''df["Net Amount"] != df["Opportunity Amount"]''', "query": query},
-            PIE_LABELS[1]: {"df": '''df["Net Amount"] == df["Opportunity Amount"]''', "query": query},
-        },
-        columns=df.columns.tolist()
-    )
-
-    # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "Unsynced_Primary_Quote"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -211,7 +181,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "Unsynced_Primary_Quote.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -1,12 +1,17 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from dotenv import load_dotenv
-from data_extraction.salesforce_client import get_salesforce_client, run_query
-from data_extraction.loaders import records_to_df, extract_nested_fields, extract_nested_fields_n_level
-from filters.contract_filters import apply_filters
+from data_extraction.salesforce_client import get_salesforce_client
+from data_extraction.cache import cached_query, cached_total
+from data_extraction.loaders import normalize_relationship
 from chart_generator.matplotlib_charts import generate_pie_chart, bar_chart
 from report.report_generator import build_leakage_report
+from report.excel_export import write_excel
+from report.pdf_pool import submit_report
 from ai_chart_overview_generator.groq_overview_generator import generate_pie_label_summary, build_pie_segments
+from utils.ai_format import format_ai_response
+from utils.output_dirs import ensure_dirs
 
 # ------------------------------------------------------------------
 # Constants (Allowed at module level)
@@ -19,8 +24,13 @@ PIE_LABELS = [
 
 PIE_COLORS = ["#FF7782", '#88E788']
 
+# Subscription fields queried (contract relationships arrive nested)
+SUBSCRIPTION_FIELDS = [
+    "Id", "Name", "SBQQ__SubscriptionEndDate__c", "SBQQ__NetPrice__c", "SBQQ__Contract__r",
+]
+
 
-def run(sf, base_output_dir):
+def run(sf, base_output_dir, ctx=None):
 
     # ------------------------------------------------------------------
     # Create Usecase Folder
@@ -36,28 +46,27 @@ def run(sf, base_output_dir):
     # ------------------------------------------------------------------
 
     query = """
-    SELECT id, Name, SBQQ__SubscriptionEndDate__c, SBQQ__NetPrice__c,
+    SELECT Id, Name, SBQQ__SubscriptionEndDate__c, SBQQ__NetPrice__c,
            SBQQ__Contract__r.SBQQ__Opportunity__r.Name,
            SBQQ__Contract__r.SBQQ__Quote__r.SBQQ__Type__c
     FROM SBQQ__Subscription__c
+    WHERE SBQQ__SubscriptionEndDate__c != NULL
+    AND SBQQ__SubscriptionEndDate__c < TODAY
     """
 
-    records = run_query(sf, query)
-    df = records_to_df(records)
+    # Both segments are expired subscriptions, so only those are fetched;
+    # the revenue total still covers every dated subscription
+    total_query = """
+    SELECT SUM(SBQQ__NetPrice__c) total
+    FROM SBQQ__Subscription__c
+    WHERE SBQQ__SubscriptionEndDate__c != NULL
+    """
 
-    nested_mapping = {
-        "SBQQ__Contract__r": {
-            "SBQQ__Opportunity__r": {
-                "Name": "Opportunity Name"
-            },
-            "SBQQ__Quote__r": {
-                "SBQQ__Type__c": "Quote Type"
-            }
-        }
-    }
+    # Shared per-process/on-disk cache; the fixed columns drop "attributes"
+    df = cached_query(sf, query, columns=SUBSCRIPTION_FIELDS)
 
     df = df.rename(columns={
-        "id": "Subscription ID",
+        "Id": "Subscription ID",
         "SBQQ__SubscriptionEndDate__c": "Subscription End Date",
         "Name": "Subscription Name",
         "SBQQ__NetPrice__c" : "Net Price"
@@ -68,9 +77,14 @@ def run(sf, base_output_dir):
         errors="coerce"
     )
 
-    df = extract_nested_fields_n_level(df, nested_mapping)
-
-    df.drop(columns=["SBQQ__Contract__r"], inplace=True)
+    # Both contract paths flattened in one json_normalize pass
+    df = pd.concat([
+        df.drop(columns=["SBQQ__Contract__r"]),
+        normalize_relationship(df["SBQQ__Contract__r"], {
+            "SBQQ__Opportunity__r.Name": "Opportunity Name",
+            "SBQQ__Quote__r.SBQQ__Type__c": "Quote Type",
+        }),
+    ], axis=1)
 
     df = df[df["Subscription End Date"].notna()]
 
@@ -78,6 +92,9 @@ def run(sf, base_output_dir):
     # Filters
     # ------------------------------------------------------------------
 
+    # Descriptive only: these dicts tell the AI summary what each segment
+    # holds. The query's WHERE clause keeps expired subscriptions and the
+    # mask below does the split, so keep all three in step.
     unhealthy_filter = {
         "Subscription End Date": {"<": today},
         "Quote Type": {"=": "Renewal"}
@@ -88,8 +105,25 @@ def run(sf, base_output_dir):
         "Quote Type": {"!=": "Renewal"}
     }
 
-    unhealthy_df = apply_filters(filters=unhealthy_filter, df=df)
-    healthy_df = apply_filters(df=df, filters=healthy_filter)
+    # Every fetched subscription has expired, so one Quote Type mask splits
+    # them (missing quote types are != "Renewal", as with the filter dicts)
+    renewal = (df["Quote Type"] == "Renewal").to_numpy()
+
+    unhealthy_df = df[renewal]
+    healthy_df = df[~renewal]
+
+    # ------------------------------------------------------------------
+    # Shared asset folders for category-level reports
+    # ------------------------------------------------------------------
+
+    # Created once by the orchestrator; standalone calls create them here
+    if ctx is None:
+        ctx = ensure_dirs(base_output_dir)
+
+    data_chart_dir = ctx["data_chart_dir"]
+    data_summary_dir = ctx["data_summary_dir"]
+
+    USECASE_NAME = "Expired_Subscription_Not_Renewed"
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
@@ -99,104 +133,57 @@ def run(sf, base_output_dir):
         labels=PIE_LABELS,
         values=[len(unhealthy_df), len(healthy_df)],
         output_path=os.path.join(output_dir, "Expired_Subscription_Not_Renewed.png"),
-        colors=PIE_COLORS
+        colors=PIE_COLORS,
+        extra_output_paths=[os.path.join(data_chart_dir, f"{USECASE_NAME}.png")]
     )
 
     # ------------------------------------------------------------------
-    # Save Excel Files
+    # Save Excel Files and request AI summary
     # ------------------------------------------------------------------
 
-    unhealthy_df.to_excel(
-        os.path.join(output_dir, "expired_subscription_not_renewed_subscriptions.xlsx"),
-        index=False
-    )
-
-    healthy_df.to_excel(
-        os.path.join(output_dir, "healthy_subscriptions.xlsx"),
-        index=False
-    )
+    # Independent I/O sinks: the Excel writes run while the Groq round-trip
+    # is in flight
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        ai_future = executor.submit(
+            generate_pie_label_summary,
+            labels={
+                PIE_LABELS[0]: len(unhealthy_df),
+                PIE_LABELS[1]: len(healthy_df)
+            },
+            segment_filters={
+                PIE_LABELS[0]: unhealthy_filter,
+                PIE_LABELS[1]: healthy_filter,
+            },
+            columns=df.columns.tolist()
+        )
+        sink_futures = [
+            executor.submit(write_excel, unhealthy_df, os.path.join(output_dir, "expired_subscription_not_renewed_subscriptions.xlsx")),
+            executor.submit(write_excel, healthy_df, os.path.join(output_dir, "healthy_subscriptions.xlsx")),
+        ]
+        ai_response = ai_future.result()
+        for future in sink_futures:
+            future.result()
 
     # ------------------------------------------------------------------
-    # Prepare Tables
+    # Prepare Tables (frames are read row by row by the report builder)
     # ------------------------------------------------------------------
 
-    unhealthy_table = (
-        [unhealthy_df.columns.tolist()] +
-        unhealthy_df.values.tolist()
-    )
-
-    healthy_table = (
-        [healthy_df.columns.tolist()] +
-        healthy_df.values.tolist()
-    )
-
     tables_list = [
         {
-            "data": unhealthy_table,
+            "data": unhealthy_df,
             "title": f"Expired Subscription Not Renewed ({len(unhealthy_df)})",
             "background_color": PIE_COLORS[0]
         },
         {
-            "data": healthy_table,
+            "data": healthy_df,
             "title": f"Healthy Subscriptions ({len(healthy_df)})",
             "background_color": PIE_COLORS[1]
         }
     ]
 
-    # ------------------------------------------------------------------
-    # AI Summary
-    # ------------------------------------------------------------------
-
-    ai_response = generate_pie_label_summary(
-        labels={
-            PIE_LABELS[0]: len(unhealthy_df),
-            PIE_LABELS[1]: len(healthy_df)
-        },
-        segment_filters={
-            PIE_LABELS[0]: unhealthy_filter,
-            PIE_LABELS[1]: healthy_filter,
-        },
-        columns=df.columns.tolist()
-    )
-
-    # ----------------------------------------------------
-    # Store reusable assets for category-level reports
-    # ----------------------------------------------------
-
-    data_chart_dir = os.path.join(base_output_dir, "Data_Chart")
-    data_summary_dir = os.path.join(base_output_dir, "Data_Summary")
-
-    os.makedirs(data_chart_dir, exist_ok=True)
-    os.makedirs(data_summary_dir, exist_ok=True)
-
-    USECASE_NAME = "Expired_Subscription_Not_Renewed"
-
-    import shutil
-    shutil.copy(chart_path, os.path.join(data_chart_dir, f"{USECASE_NAME}.png"))
-
     # -------- SAFELY FORMAT AI RESPONSE --------
 
-    if isinstance(ai_response, list):
-
-        formatted_lines = []
-
-        for item in ai_response:
-            if isinstance(item, dict):
-                # If dictionary → format nicely
-                for key, value in item.items():
-                    formatted_lines.append(f"{key}: {value}")
-            else:
-                formatted_lines.append(str(item))
-
-        summary_text = "\n\n".join(formatted_lines)
-
-    elif isinstance(ai_response, dict):
-        summary_text = "\n\n".join(
-            f"{k}: {v}" for k, v in ai_response.items()
-        )
-
-    else:
-        summary_text = str(ai_response)
+    summary_text = format_ai_response(ai_response)
 
     # -------- WRITE SUMMARY FILE --------
 
@@ -226,7 +213,9 @@ def run(sf, base_output_dir):
     # Build Report
     # ------------------------------------------------------------------
 
-    build_leakage_report(
+    # Rendered in the background; main() waits for the pool before exiting
+    submit_report(
+        build_leakage_report,
         output_pdf=os.path.join(output_dir, "Expired_Subscription_Not_Renewed.pdf"),
         image_path=chart_path,
         tables_list=tables_list,
@@ -243,6 +232,6 @@ def run(sf, base_output_dir):
     return {
         "name": "Expired_Subscription_Not_Renewed",
         "records_found": len(unhealthy_df),
-        "total_revenue": df["Net Price"].sum() - unhealthy_df["Net Price"].sum(),
+        "total_revenue": cached_total(sf, total_query) - unhealthy_df["Net Price"].sum(),
         "total_loss": unhealthy_df["Net Price"].sum()
     }
\ No newline at end of file
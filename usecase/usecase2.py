@@ -79,7 +79,7 @@ def run(sf, base_output_dir):
 
     df = extract_nested_fields_n_level(df, nested_mapping)
 
-    renewal_none_df = df[df["Renewal Opp Amount"].isna()].copy()
+    renewal_none_df = df[df["Renewal Opp Amount"].isna()]
 
     # Drop rows where required values missing
     # df = df.dropna(subset=[
@@ -106,26 +106,26 @@ def run(sf, base_output_dir):
     df_oldSameAsNew = df[
         df["Old Opp Amount"] ==
         df["Renewal Opp Amount"]
-    ].copy()
+    ]
 
     df_Healthy = df[
         df["Expected Renewal Value"] ==
         df["Renewal Opp Amount"]
-    ].copy()
+    ]
 
     df_oldGreaterThanNew = df[
         df["Old Opp Amount"] >
         df["Renewal Opp Amount"]
-    ].copy()
+    ]
 
     df_oldLessThanNew = df[
         df["Old Opp Amount"] <
         df["Renewal Opp Amount"]
-    ].copy()
+    ]
 
     renewal_none_df = df[
         df["Renewal Opp Amount"].isna()
-    ].copy()
+    ]
     
     zombie_contract_info_df = pd.concat([df_oldSameAsNew, df_oldGreaterThanNew, df_oldLessThanNew])
         
@@ -54,7 +54,7 @@ def run(sf, base_output_dir):
     }
 
     ghost_orders_df     = apply_filters(filters=filters, df=df)
-    non_ghost_orders_df = df.loc[~df.index.isin(ghost_orders_df.index)].copy()
+    non_ghost_orders_df = df.loc[~df.index.isin(ghost_orders_df.index)]
 
     # ----------------------------------------------------------------
     # 4. Generate pie chart
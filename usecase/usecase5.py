@@ -66,7 +66,7 @@ def run(sf, base_output_dir):
 
     active_sale_df = df.loc[
         ~df.index.isin(inactive_sale_df.index)
-    ].copy()
+    ]
 
     # ------------------------------------------------------------------
     # Generate Pie Chart
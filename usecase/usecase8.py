@@ -118,6 +118,7 @@ def run(sf, base_output_dir):
         eternal_trial_df,
         "Product Family",
         os.path.join(output_dir, "eternal_trial_by_product_family_bar_chart.png"),
+        sort_bars=True,
     )
 
     assert os.path.exists(chart_path), "Pie chart image was not generated"
@@ -0,0 +1,24 @@
+def format_ai_response(ai_response) -> str:
+    """
+    Flatten a parsed AI pie-chart overview into the Data_Summary text format.
+
+    Args:
+        ai_response: List of segment dicts (usual case), a single dict, or
+            anything else returned by the model
+
+    Returns:
+        "key: value" lines separated by blank lines
+    """
+    if isinstance(ai_response, list):
+        formatted_lines = []
+        for item in ai_response:
+            if isinstance(item, dict):
+                formatted_lines.extend(f"{key}: {value}" for key, value in item.items())
+            else:
+                formatted_lines.append(str(item))
+        return "\n\n".join(formatted_lines)
+
+    if isinstance(ai_response, dict):
+        return "\n\n".join(f"{k}: {v}" for k, v in ai_response.items())
+
+    return str(ai_response)
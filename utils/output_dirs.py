@@ -0,0 +1,21 @@
+import os
+
+
+def ensure_dirs(base_output_dir):
+    """
+    Create the run-wide Data_Chart/Data_Summary folders once.
+
+    Args:
+        base_output_dir: Timestamped output directory of the run
+
+    Returns:
+        ctx dict with "data_chart_dir" and "data_summary_dir", handed to
+        each usecase's run(sf, base_output_dir, ctx)
+    """
+    ctx = {
+        "data_chart_dir": os.path.join(base_output_dir, "Data_Chart"),
+        "data_summary_dir": os.path.join(base_output_dir, "Data_Summary"),
+    }
+    os.makedirs(ctx["data_chart_dir"], exist_ok=True)
+    os.makedirs(ctx["data_summary_dir"], exist_ok=True)
+    return ctx